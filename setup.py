@@ -16,6 +16,8 @@ setup(
     url='https://github.com/pikhovkin/django-soft-remover',
     packages=[
         'soft_remover',
+        'soft_remover.management',
+        'soft_remover.management.commands',
     ],
     include_package_data=True,
     install_requires=[
@@ -0,0 +1 @@
+from .cache import restore_cache  # noqa: F401
@@ -0,0 +1,57 @@
+import copy
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, models
+
+
+__all__ = (
+    'create_archive_model',
+)
+
+
+def create_archive_model(model):
+    # Shadow model of removed rows without unique constraints and foreign key constraints, the table is <table>_archive
+    opts = model._meta
+    if opts.parents:
+        raise ImproperlyConfigured(f'{opts.label}: archive of multi-table inheritance models is not supported')
+
+    meta = type('Meta', (), {
+        'app_label': opts.app_label,
+        'db_table': f'{opts.db_table}_archive',
+        'managed': opts.managed,
+    })
+    attrs = {'__module__': model.__module__, 'Meta': meta}
+    for field in opts.local_concrete_fields:
+        if field.is_relation:
+            # Swappable targets are looked up in the app registry, which isn't ready yet
+            field = copy.copy(field)
+            field.swappable = False
+        name, path, args, kwargs = field.deconstruct()
+        kwargs.pop('unique', None)
+        kwargs.pop('db_index', None)
+        field_class = field.__class__
+        if field.is_relation:
+            kwargs.update(related_name='+', db_constraint=False, on_delete=models.DO_NOTHING)
+            if isinstance(field, models.OneToOneField):
+                # One-to-one fields are always unique
+                field_class = models.ForeignKey
+        attrs[name] = field_class(*args, **kwargs)
+    return type(f'{model.__name__}Archive', (models.Model,), attrs)
+
+
+def _move_rows(source, target, pks, using, **values):
+    # INSERT ... SELECT of rows by primary keys, `values` replace columns of the fields
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    fields = source._meta.concrete_fields
+    columns = ', '.join(qn(f.column) for f in fields)
+    select = ', '.join('%s' if f.name in values else qn(f.column) for f in fields)
+    params = [values[f.name] for f in fields if f.name in values] + list(pks)
+    sql = (
+        f'INSERT INTO {qn(target._meta.db_table)} ({columns}) '
+        f'SELECT {select} FROM {qn(source._meta.db_table)} '
+        f'WHERE {qn(source._meta.pk.column)} IN ({", ".join(["%s"] * len(pks))})'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
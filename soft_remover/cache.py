@@ -0,0 +1,356 @@
+import hashlib
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models, router
+from django.db.models.signals import post_delete, post_save
+
+from .signals import post_soft_delete, post_restore
+
+
+__all__ = (
+    'restore_cache',
+    'SoftRemoverCache',
+    'RemovedIds',
+)
+
+
+_restore_caches = ContextVar('soft_remover_restore_caches', default={})
+
+
+class _RemovedKeys:
+    # Primary keys of removed rows by unique keys of the write database, loaded with one query on the first lookup
+
+    def __init__(self, model):
+        self.model = model
+        self.using = router.db_for_write(model)
+        self.unique_attnames = model._meta.soft_remover.unique_attnames
+        self.index = None
+        self.pks = None
+
+    def _key(self, attnames, values):
+        return tuple(self.model._meta.get_field(attname).to_python(value) for attname, value in zip(attnames, values))
+
+    def _add(self, pk, values):
+        self.pks.add(pk)
+        for attnames in self.unique_attnames:
+            self.index[attnames][self._key(attnames, (values[attname] for attname in attnames))].add(pk)
+
+    def load(self):
+        key_attnames = sorted({attname for attnames in self.unique_attnames for attname in attnames})
+        self.index = {attnames: defaultdict(set) for attnames in self.unique_attnames}
+        self.pks = set()
+        for pk, *values in self.model.objects.db_manager(self.using).removed().values_list('pk', *key_attnames):
+            self._add(pk, dict(zip(key_attnames, values)))
+
+    def lookup(self, obj):
+        # The newest removed row sharing any unique key with the object, same as the query of `save()`
+        if self.index is None:
+            self.load()
+        pks = set()
+        for attnames in self.unique_attnames:
+            key = self._key(attnames, (getattr(obj, attname) for attname in attnames))
+            pks |= self.index[attnames].get(key, set())
+        pks &= self.pks
+        return max(pks) if pks else None
+
+    def add(self, obj):
+        if self.index is not None:
+            values = {attname: getattr(obj, attname) for attnames in self.unique_attnames for attname in attnames}
+            self._add(obj.pk, values)
+
+    def discard(self, pk):
+        if self.pks is not None:
+            self.pks.discard(pk)
+
+    def invalidate(self):
+        self.index = self.pks = None
+
+
+@contextmanager
+def restore_cache(*models):
+    # Restoring `save()` of the models looks up removed rows in memory instead of a query per object
+    caches = {**_restore_caches.get(), **{model: _RemovedKeys(model) for model in models}}
+    token = _restore_caches.set(caches)
+    try:
+        yield
+    finally:
+        _restore_caches.reset(token)
+
+
+def _get_restore_cache(model):
+    return _restore_caches.get().get(model)
+
+
+def _soft_remover_invalidate(signal, sender, instance=None, **kwargs):
+    restore_caches = _restore_caches.get()
+    if not restore_caches:
+        return
+    if sender._meta.soft_remover.cascade:
+        # Rows of other models may be changed by the cascade
+        for cache in restore_caches.values():
+            cache.invalidate()
+        return
+    cache = restore_caches.get(sender)
+    if cache is None:
+        return
+    if instance is None:
+        cache.invalidate()
+    elif signal is post_soft_delete:
+        cache.add(instance)
+    else:
+        cache.discard(instance.pk)
+
+
+post_soft_delete.connect(_soft_remover_invalidate)
+post_restore.connect(_soft_remover_invalidate)
+
+
+# Cached value of missing and removed rows
+_MISSING = 'soft_remover:missing'
+
+
+class SoftRemoverCache:
+    """
+    Read-through cache of live rows by primary key and unique keys (`Model.objects.cached`).
+    Writes of instances invalidate their keys, bulk writes invalidate all keys of a model.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        options = model._meta.soft_remover
+        if options.cache is None:
+            raise ImproperlyConfigured(f'{model._meta.label}: cache is not enabled by MetaSoftRemover')
+        self.cache = caches[options.cache]
+        self.timeout = options.cache_timeout
+        self.prefix = f'soft_remover:{model._meta.label}'
+        self.using = options.db_for_read()
+
+    def _generation(self):
+        generation = self.cache.get(f'{self.prefix}:generation')
+        if generation is None:
+            self.cache.add(f'{self.prefix}:generation', 0, None)
+            generation = self.cache.get(f'{self.prefix}:generation', 0)
+        return generation
+
+    def _key(self, generation, attnames, values):
+        digest = hashlib.sha1(repr(tuple(values)).encode()).hexdigest()
+        return f'{self.prefix}:{generation}:{",".join(attnames)}:{digest}'
+
+    def _values(self, attnames, values):
+        return [
+            self.model._meta.get_field(attname).to_python(value.pk if isinstance(value, models.Model) else value)
+            for attname, value in zip(attnames, values)
+        ]
+
+    def _unique_key(self, lookup):
+        attnames = {self.model._meta.get_field(name).attname: value for name, value in lookup.items()}
+        for unique_attnames in self.model._meta.soft_remover.unique_attnames:
+            if set(unique_attnames) == set(attnames):
+                return unique_attnames, self._values(unique_attnames, [attnames[a] for a in unique_attnames])
+        raise ValueError(f'{self.model._meta.label}: {", ".join(lookup)} is not a unique key')
+
+    def get(self, pk=None, **lookup):
+        if lookup:
+            return self.get_by_unique(**lookup)
+        generation = self._generation()
+        key = self._key(generation, ('pk',), self._values((self.model._meta.pk.attname,), (pk,)))
+        obj = self.cache.get(key)
+        if obj is None:
+            obj = self.model.objects.db_manager(self.using).filter(pk=pk).first()
+            self.cache.set(key, _MISSING if obj is None else obj, self.timeout)
+        if obj is None or obj == _MISSING:
+            raise self.model.DoesNotExist(f'{self.model._meta.object_name} matching query does not exist.')
+        return obj
+
+    def get_by_unique(self, **lookup):
+        attnames, values = self._unique_key(lookup)
+        key = self._key(self._generation(), attnames, values)
+        pk = self.cache.get(key)
+        if pk is not None and pk != _MISSING:
+            obj = self.get(pk=pk)
+            # The row may be changed by a write missed by the invalidation
+            if self._values(attnames, [getattr(obj, attname) for attname in attnames]) == values:
+                return obj
+            pk = None
+        if pk is None:
+            obj = self.model.objects.db_manager(self.using).filter(**lookup).first()
+            self.cache.set(key, _MISSING if obj is None else obj.pk, self.timeout)
+            if obj is not None:
+                return obj
+        raise self.model.DoesNotExist(f'{self.model._meta.object_name} matching query does not exist.')
+
+    def invalidate(self, obj=None):
+        # Keys of the instance, all keys of the model without it
+        if obj is None:
+            try:
+                self.cache.incr(f'{self.prefix}:generation')
+            except ValueError:
+                self.cache.set(f'{self.prefix}:generation', 1, None)
+            return
+        generation = self._generation()
+        keys = [self._key(generation, ('pk',), self._values((self.model._meta.pk.attname,), (obj.pk,)))]
+        for attnames in self.model._meta.soft_remover.unique_attnames:
+            values = self._values(attnames, [getattr(obj, attname) for attname in attnames])
+            keys.append(self._key(generation, attnames, values))
+        self.cache.delete_many(keys)
+
+
+def _soft_remover_invalidate_cached(signal, sender, instance=None, **kwargs):
+    options = sender._meta.soft_remover
+    if signal in (post_soft_delete, post_restore) and options.cascade:
+        # Rows of other models may be changed by the cascade
+        from django.apps import apps
+
+        for model in apps.get_models():
+            if getattr(model._meta, 'soft_remover', None) is not None and model._meta.soft_remover.cache is not None:
+                SoftRemoverCache(model).invalidate()
+    elif options.cache is not None:
+        SoftRemoverCache(sender).invalidate(instance)
+
+
+def _soft_remover_connect_cache(model):
+    # Django's signals of the model only, receivers of all models would disable fast deletes
+    post_save.connect(_soft_remover_invalidate_cached, sender=model)
+    post_delete.connect(_soft_remover_invalidate_cached, sender=model)
+
+
+post_soft_delete.connect(_soft_remover_invalidate_cached)
+post_restore.connect(_soft_remover_invalidate_cached)
+
+
+class RemovedIds:
+    """
+    In-process set of primary keys of removed rows (`Model.objects.removed_ids()`), a sorted `array('q')`
+    for integer primary keys. Soft removal signals and hard deletions of the process update it, after
+    `removed_ids_ttl` seconds it's refreshed by `removed_at` (new removals only) or reloaded without it.
+    Every `reload_refreshes`-th refresh is a reload, so restores and deletions of other processes are seen.
+    """
+
+    reload_refreshes = 10
+
+    def __init__(self, model):
+        self.model = model
+        self.ttl = model._meta.soft_remover.removed_ids_ttl
+        self.integer = model._meta.pk.get_internal_type() in (
+            'AutoField', 'BigAutoField', 'SmallAutoField', 'IntegerField', 'BigIntegerField', 'SmallIntegerField',
+        )
+        self.lock = threading.Lock()
+        self.pks = None
+        self.added = set()
+        self.discarded = set()
+        self.high_water = None
+        self.refreshed = None
+        self.refreshes = 0
+
+    def _removed(self):
+        return self.model._base_manager.db_manager(self.model._meta.soft_remover.db_for_read()).filter(is_removed=True)
+
+    def reload(self):
+        with self.lock:
+            removed_at = self.model._meta.soft_remover.has_removed_at
+            rows = self._removed().order_by().values_list('pk', 'removed_at' if removed_at else 'pk')
+            pks, high_water = [], None
+            for pk, value in rows:
+                pks.append(pk)
+                if removed_at and value is not None and (high_water is None or value > high_water):
+                    high_water = value
+            pks.sort()
+            self.pks = array('q', pks) if self.integer else pks
+            self.added, self.discarded = set(), set()
+            self.high_water = high_water
+            self.refreshed = time.monotonic()
+            self.refreshes = 0
+
+    def refresh(self):
+        if self.high_water is None or self.refreshes + 1 >= self.reload_refreshes:
+            return self.reload()
+        with self.lock:
+            rows = self._removed().filter(removed_at__gte=self.high_water).values_list('pk', 'removed_at')
+            for pk, removed_at in rows:
+                self.added.add(pk)
+                self.discarded.discard(pk)
+                self.high_water = max(self.high_water, removed_at)
+            self.refreshed = time.monotonic()
+            self.refreshes += 1
+
+    def _contains(self, pk):
+        if pk in self.added:
+            return True
+        if pk in self.discarded:
+            return False
+        i = bisect_left(self.pks, pk)
+        return i < len(self.pks) and self.pks[i] == pk
+
+    def contains_many(self, pks):
+        if self.pks is None:
+            self.reload()
+        elif self.ttl is not None and time.monotonic() - self.refreshed >= self.ttl:
+            self.refresh()
+        to_python = self.model._meta.pk.to_python
+        return {pk: self._contains(to_python(pk)) for pk in pks}
+
+    def add(self, pk):
+        self.added.add(pk)
+        self.discarded.discard(pk)
+
+    def discard(self, pk):
+        self.added.discard(pk)
+        self.discarded.add(pk)
+
+    def invalidate(self):
+        self.pks = None
+
+
+_removed_ids = {}
+
+
+def removed_ids(model):
+    if model not in _removed_ids:
+        _removed_ids.setdefault(model, RemovedIds(model))
+    return _removed_ids[model]
+
+
+def _soft_remover_update_removed_ids(signal, sender, instance=None, **kwargs):
+    if not _removed_ids:
+        return
+    if sender._meta.soft_remover.cascade or instance is None:
+        # Bulk writes and cascades reload the sets
+        models = list(_removed_ids) if sender._meta.soft_remover.cascade else [sender]
+        for model in models:
+            if model in _removed_ids:
+                _removed_ids[model].invalidate()
+    elif sender in _removed_ids:
+        if signal is post_soft_delete:
+            _removed_ids[sender].add(instance.pk)
+        else:
+            _removed_ids[sender].discard(instance.pk)
+
+
+post_soft_delete.connect(_soft_remover_update_removed_ids)
+post_restore.connect(_soft_remover_update_removed_ids)
+
+
+def _soft_remover_hard_deleted(model, pks, counts):
+    # Rows deleted from the tables aren't removed: `pks` of the model are discarded, sets of the other deleted
+    # models (and of the model without `pks`) are reloaded
+    if not _removed_ids:
+        return
+    from django.apps import apps
+
+    for label, count in counts.items():
+        deleted_model = apps.get_model(label)
+        if not count or deleted_model not in _removed_ids:
+            continue
+        if deleted_model is model and pks is not None:
+            for pk in pks:
+                _removed_ids[model].discard(pk)
+        else:
+            _removed_ids[deleted_model].invalidate()
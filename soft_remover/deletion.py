@@ -0,0 +1,126 @@
+from collections import Counter, defaultdict, deque
+
+from django.db import models, transaction
+from django.db.models.deletion import ProtectedError, get_candidate_relations_to_delete
+
+from .managers import SoftRemovableQuerySet, _chunks
+from .models import BaseSoftRemovableModel
+from .options import CASCADE_FIELD
+
+
+__all__ = (
+    'SoftCollector',
+)
+
+
+class SoftCollector:
+    """
+    Soft removal of rows related with CASCADE (soft removable models only) like Django's `Collector`.
+    Rows removed by the cascade are marked with `removed_by_cascade` field if a model has it,
+    only marked rows are restored by the cascade, unless their unique keys are taken by live rows.
+    """
+
+    batch_size = SoftRemovableQuerySet.soft_remover_batch_size
+
+    def __init__(self, using):
+        self.using = using
+        self.origin = None
+        self.data = defaultdict(set)
+        self.skipped = {}
+        self._taken = defaultdict(dict)
+
+    def _related_objects(self, rel, pks, restore):
+        queryset = rel.related_model._base_manager.using(self.using).filter(**{f'{rel.field.name}__pk__in': pks})
+        if not issubclass(rel.related_model, BaseSoftRemovableModel):
+            return queryset
+        if restore:
+            return queryset.filter(is_removed=True, **{CASCADE_FIELD: True})
+        return queryset.filter(is_removed=False)
+
+    def collect(self, model, pks, restore=False):
+        self.origin = (model, set(pks))
+        queue = deque([self.origin])
+        while queue:
+            model, pks = queue.popleft()
+            pks = pks - self.data[model]
+            if not pks:
+                continue
+            self.data[model] |= pks
+            if restore:
+                # Rows whose unique keys are taken stay removed with the rows related to them
+                pks, skipped = self._split_restorable(model, pks)
+                if skipped:
+                    self.skipped[model._meta.label] = sorted([*self.skipped.get(model._meta.label, ()), *skipped])
+
+            for rel in get_candidate_relations_to_delete(model._meta):
+                if rel.field.remote_field.parent_link:
+                    continue
+                related_model = rel.related_model
+                for chunk in _chunks(sorted(pks), self.batch_size):
+                    if rel.on_delete is models.PROTECT and not restore:
+                        related = self._related_objects(rel, chunk, restore)
+                        if related.exists():
+                            raise ProtectedError(
+                                f"Cannot remove some instances of model '{model.__name__}' because they are "
+                                f"referenced through a protected foreign key: "
+                                f"'{related_model.__name__}.{rel.field.name}'",
+                                set(related),
+                            )
+                    elif (
+                        rel.on_delete is models.CASCADE
+                        and issubclass(related_model, BaseSoftRemovableModel)
+                        and (not restore or related_model._meta.soft_remover.has_cascade_field)
+                    ):
+                        related = self._related_objects(rel, chunk, restore)
+                        queue.append((related_model, set(related.values_list('pk', flat=True))))
+
+    def _cascaded(self, model, pks):
+        origin_model, origin_pks = self.origin
+        fields = {CASCADE_FIELD: True} if model._meta.soft_remover.has_cascade_field else {}
+        if model is origin_model:
+            yield {}, pks & origin_pks
+            pks = pks - origin_pks
+        yield fields, pks
+
+    def delete(self):
+        counter = Counter()
+        with transaction.atomic(using=self.using, savepoint=False):
+            for model, pks in self.data.items():
+                for fields, model_pks in self._cascaded(model, pks):
+                    for chunk in _chunks(sorted(model_pks), self.batch_size):
+                        queryset = SoftRemovableQuerySet(model, using=self.using).filter(pk__in=chunk)
+                        counter[model._meta.label] += queryset._soft_remover_delete(**fields)
+        counter = +counter
+        return sum(counter.values()), dict(counter)
+
+    def _split_restorable(self, model, pks):
+        # Like `restore()` of querysets: removed rows whose unique keys are taken by live rows or by rows
+        # collected before are skipped, the newest removed version goes first
+        if not model._meta.soft_remover.unique_attnames:
+            return pks, []
+        queryset = SoftRemovableQuerySet(model, using=self.using)
+        fields = ('pk', 'remver' if model._meta.soft_remover.has_remver else 'pk')
+        rows = []
+        for chunk in _chunks(sorted(pks), self.batch_size):
+            chunk_rows = queryset.filter(pk__in=chunk, is_removed=True)
+            rows += chunk_rows.values_list(*fields, *queryset._soft_remover_key_attnames())
+        rows.sort(key=lambda row: (row[1], row[0]), reverse=True)
+        live = model._base_manager.using(self.using).filter(is_removed=False)
+        rows = [(row[0], *row[2:]) for row in rows]
+        free, skipped = queryset._soft_remover_split_free(live, rows, taken=self._taken[model])
+        return set(free), skipped
+
+    def restore(self):
+        # Rows skipped by `collect()` stay removed, their primary keys by model labels are in `skipped`
+        counter = Counter()
+        with transaction.atomic(using=self.using, savepoint=False):
+            for model, pks in self.data.items():
+                fields = model._meta.soft_remover.removed_fields(False)
+                if model._meta.soft_remover.has_remver:
+                    fields['remver'] = 0
+                pks = pks - set(self.skipped.get(model._meta.label, ()))
+                manager = model._base_manager.using(self.using)
+                for chunk in _chunks(sorted(pks), self.batch_size):
+                    counter[model._meta.label] += manager.filter(pk__in=chunk, is_removed=True).update(**fields)
+        counter = +counter
+        return sum(counter.values()), dict(counter)
@@ -0,0 +1,107 @@
+import csv
+import sys
+import time
+from collections import Counter
+
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import router
+
+from soft_remover.managers import SoftRemovableQuerySet
+from soft_remover.models import BaseSoftRemovableModel
+
+
+class SoftRemoverCommand(BaseCommand):
+    def add_arguments(self, parser):
+        parser.add_argument('model', help='Model in the app_label.ModelName format.')
+        parser.add_argument('--batch-size', type=int, default=SoftRemovableQuerySet.soft_remover_batch_size)
+        parser.add_argument('--sleep', type=float, default=0, help='Pause between chunks in seconds.')
+        parser.add_argument('--database', default=None, help="Database alias, the router's one for writes by default.")
+
+    def get_model(self, label):
+        try:
+            model = apps.get_model(label)
+        except (LookupError, ValueError) as e:
+            raise CommandError(str(e))
+        if not issubclass(model, BaseSoftRemovableModel):
+            raise CommandError(f'{label} is not a soft removable model.')
+        return model
+
+    def get_database(self, model, options):
+        return options['database'] or router.db_for_write(model)
+
+    def report(self, model, count, action, started):
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'{count} rows of {model._meta.label} {action} in {elapsed:.1f}s ({count / max(elapsed, 1e-6):.0f} rows/s)'
+        )
+
+
+class SoftRemoverPksCommand(SoftRemoverCommand):
+    # Applies `apply_chunk()` to chunks of primary keys from the first column of a CSV file or stdin
+    action = None
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('file', nargs='?', default='-', help='CSV file of primary keys, stdin by default.')
+        parser.add_argument('--dry-run', action='store_true', help='Count the rows without changing them.')
+
+    def read_pks(self, model, stream, batch_size):
+        chunk = []
+        for i, row in enumerate(csv.reader(stream)):
+            if not row or not row[0].strip():
+                continue
+            try:
+                chunk.append(model._meta.pk.to_python(row[0].strip()))
+            except ValidationError:
+                if i == 0:  # Header
+                    continue
+                raise CommandError(f'Invalid primary key in line {i + 1}: {row[0]!r}')
+            if len(chunk) == batch_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def count_chunk(self, model, pks, database):
+        raise NotImplementedError
+
+    def apply_chunk(self, model, pks, database):
+        # Returns the number of rows of the model and the numbers of cascaded rows by model labels
+        raise NotImplementedError
+
+    def open_file(self, path):
+        if path == '-':
+            return sys.stdin
+        try:
+            return open(path, newline='')
+        except OSError as e:
+            raise CommandError(f"Can't open {path}: {e.strerror}")
+
+    def handle(self, *args, **options):
+        model = self.get_model(options['model'])
+        database = self.get_database(model, options)
+        started = time.monotonic()
+        stream = self.open_file(options['file'])
+        count, cascaded = 0, Counter()
+        try:
+            for i, pks in enumerate(self.read_pks(model, stream, options['batch_size'])):
+                if i and options['sleep']:
+                    time.sleep(options['sleep'])
+                if options['dry_run']:
+                    count += self.count_chunk(model, pks, database)
+                else:
+                    chunk_count, chunk_cascaded = self.apply_chunk(model, pks, database)
+                    count += chunk_count
+                    cascaded.update(chunk_cascaded)
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'{count} rows {self.action}, last pk {pks[-1]}')
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        action = f'would be {self.action}' if options['dry_run'] else self.action
+        self.report(model, count, action, started)
+        for label, label_count in sorted(cascaded.items()):
+            if label_count:
+                self.stdout.write(f'{label_count} rows of {label} {action} by cascade')
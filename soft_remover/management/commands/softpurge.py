@@ -0,0 +1,43 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from soft_remover.management.base import SoftRemoverCommand
+from soft_remover.managers import SoftRemovableQuerySet
+
+
+class Command(SoftRemoverCommand):
+    help = 'Hard deletes soft removed rows of a model in chunks.'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--time-budget', type=float, default=None, help='Stop after this number of seconds.')
+        parser.add_argument(
+            '--older-than', type=float, default=None, help='Only rows removed more than this number of days ago.'
+        )
+
+    def get_queryset(self, model, options):
+        queryset = SoftRemovableQuerySet(model, using=self.get_database(model, options))
+        if options['older_than'] is not None:
+            if not model._meta.soft_remover.has_removed_at:
+                raise CommandError(f'{model._meta.label} has no removed_at field.')
+            queryset = queryset.filter(removed_at__lt=timezone.now() - timedelta(days=options['older_than']))
+        return queryset
+
+    def handle(self, *args, **options):
+        model = self.get_model(options['model'])
+        started = time.monotonic()
+
+        def progress(count, last_pk):
+            if options['verbosity'] > 1:
+                self.stdout.write(f'{count} rows deleted, last pk {last_pk}')
+
+        count = self.get_queryset(model, options).purge(
+            batch_size=options['batch_size'],
+            time_budget=options['time_budget'],
+            sleep=options['sleep'],
+            progress=progress,
+        )
+        self.report(model, count, 'deleted', started)
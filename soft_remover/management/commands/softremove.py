@@ -0,0 +1,13 @@
+from soft_remover.management.base import SoftRemoverPksCommand
+
+
+class Command(SoftRemoverPksCommand):
+    help = 'Soft removes rows of a model by primary keys from a file or stdin in chunks.'
+    action = 'removed'
+
+    def count_chunk(self, model, pks, database):
+        return model.objects.db_manager(database).filter(pk__in=pks).count()
+
+    def apply_chunk(self, model, pks, database):
+        counts = model.objects.db_manager(database).soft_delete_pks(pks)[1]
+        return counts.pop(model._meta.label, 0), counts
@@ -0,0 +1,19 @@
+from django.db import transaction
+
+from soft_remover.management.base import SoftRemoverPksCommand
+
+
+class Command(SoftRemoverPksCommand):
+    help = 'Restores removed rows of a model by primary keys from a file or stdin in chunks.'
+    action = 'restored'
+
+    def count_chunk(self, model, pks, database):
+        return model.objects.db_manager(database).removed().filter(pk__in=pks).count()
+
+    def apply_chunk(self, model, pks, database):
+        queryset = model.objects.db_manager(database).get_all().filter(pk__in=pks)
+        with transaction.atomic(using=queryset.db):
+            counts, skipped = queryset._soft_remover_restore_counts()
+        if skipped:
+            self.stderr.write(f'{len(skipped)} rows skipped because of unique keys: {", ".join(map(str, skipped))}')
+        return counts.pop(model._meta.label, 0), counts
@@ -1,5 +1,20 @@
-from django.db import models
+import time
+from collections import Counter, defaultdict, namedtuple
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, connections, models, router, transaction
+from django.db.models import Max
+from django.db.models.deletion import get_candidate_relations_to_delete
 from django.db.models.query import QuerySet
+from django.utils import timezone
+
+from .archive import _move_rows
+from .cache import SoftRemoverCache, _soft_remover_hard_deleted, removed_ids
+from .metrics import _increment, _timing
+from .signals import pre_soft_delete, post_soft_delete, post_restore
 
 
 __all__ = (
@@ -8,18 +23,491 @@ __all__ = (
 )
 
 
+RemovedChange = namedtuple('RemovedChange', ('pk', 'remver', 'is_removed', 'removed_at', 'cursor'))
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _soft_remover_send(signal, metric, model, instance, using, counts, **kwargs):
+    # The signal of the origin model and the counters of every model of the cascade
+    for label, count in counts.items():
+        _increment(apps.get_model(label), metric, count)
+    signal.send(sender=model, instance=instance, using=using, count=counts.get(model._meta.label, 0), **kwargs)
+
+
+def _soft_remover_live_referenced(model, pks, using, seen=None):
+    # Primary keys of rows whose hard deletion would delete or orphan live rows: rows referenced by live rows
+    # (rows of models that aren't soft removable are live), by protecting rows or by removed rows deleted
+    # by CASCADE which are such rows themselves
+    seen = set() if seen is None else seen
+    seen.update((model, pk) for pk in pks)
+    referenced = set()
+    for rel in get_candidate_relations_to_delete(model._meta):
+        related_model, name = rel.related_model, rel.field.name
+        if rel.on_delete is models.DO_NOTHING and not rel.field.db_constraint:
+            # Rows left dangling by design, like ones of archive tables
+            continue
+        for chunk in _chunks(list(pks), SoftRemovableQuerySet.soft_remover_batch_size):
+            related = related_model._base_manager.using(using).filter(**{f'{name}__pk__in': chunk})
+            if getattr(related_model._meta, 'soft_remover', None) is None or rel.on_delete is models.PROTECT:
+                referenced.update(related.values_list(f'{name}__pk', flat=True))
+                continue
+            referenced.update(related.filter(is_removed=False).values_list(f'{name}__pk', flat=True))
+            if rel.on_delete is models.CASCADE:
+                removed = dict(related.filter(is_removed=True).values_list('pk', f'{name}__pk'))
+                removed = {pk: value for pk, value in removed.items() if (related_model, pk) not in seen}
+                if removed:
+                    live = _soft_remover_live_referenced(related_model, list(removed), using, seen)
+                    referenced.update(removed[pk] for pk in live)
+    return referenced
+
+
 class SoftRemovableQuerySet(QuerySet):
+    soft_remover_batch_size = 1000
+    # Removal versions by a window function on the backends supporting it, for models with one unique key
+    soft_remover_window_update = True
+
+    def _soft_remover_keys_filter(self, fields, keys):
+        # A superset of the rows matching `keys`, exact matching is done by grouping
+        q = models.Q()
+        for i, field in enumerate(fields):
+            values = {key[i] for key in keys}
+            fq = models.Q(**{f'{field}__in': values - {None}})
+            if None in values:
+                fq |= models.Q(**{f'{field}__isnull': True})
+            q &= fq
+        return q
+
+    def _soft_remover_max_remvers(self, fields, keys):
+        removed = self.model._base_manager.using(self.db).filter(is_removed=True)
+        if not fields:
+            return {(): removed.aggregate(soft_remover_max=Max('remver'))['soft_remover_max'] or 0}
+
+        remvers = {}
+        for chunk in _chunks(list(keys), self.soft_remover_batch_size):
+            rows = (
+                removed.filter(self._soft_remover_keys_filter(fields, chunk))
+                .order_by()
+                .values_list(*fields)
+                .annotate(soft_remover_max=Max('remver'))
+            )
+            for *key, remver in rows:
+                remvers[tuple(key)] = remver
+        return remvers
+
+    def _soft_remover_assign_remvers(self, rows):
+        # `rows` are (pk, *key fields values) ordered by pk, the result is {remver: [pk, ...]}
+        unique_fields = self.model._meta.soft_remover.unique_fields or ((),)
+        key_fields = self.model._meta.soft_remover.key_fields
+        indexes = [tuple(key_fields.index(field) + 1 for field in fields) for fields in unique_fields]
+
+        max_remvers = {}
+        for fields, index in zip(unique_fields, indexes):
+            keys = {tuple(row[i] for i in index) for row in rows}
+            max_remvers[fields] = self._soft_remover_max_remvers(fields, keys)
+
+        # Same as deleting the rows one by one: a removal version is greater than the versions of all
+        # removed rows sharing any unique key with the row
+        pks_by_remver = defaultdict(list)
+        for row in rows:
+            keys = [(fields, tuple(row[i] for i in index)) for fields, index in zip(unique_fields, indexes)]
+            remver = max(max_remvers[fields].get(key, 0) for fields, key in keys) + 1
+            for fields, key in keys:
+                max_remvers[fields][key] = remver
+            pks_by_remver[remver].append(row[0])
+        return pks_by_remver
+
+    def _soft_remover_window_supported(self, connection):
+        if not self.soft_remover_window_update or len(self.model._meta.soft_remover.unique_fields) > 1:
+            return False
+        if not connection.features.supports_over_clause:
+            return False
+        # UPDATE ... FROM
+        if connection.vendor == 'sqlite':
+            return connection.Database.sqlite_version_info >= (3, 33, 0)
+        return connection.vendor == 'postgresql'
+
+    def _soft_remover_delete_windowed(self, queryset, connection, **fields):
+        # One UPDATE numbering the rows of every unique key after the max version of its removed rows:
+        # remver = max + ROW_NUMBER() OVER (PARTITION BY <unique fields> ORDER BY pk), the max is looked up
+        # per target row by the index of the unique constraint (fields..., remver). Rows with NULL keys never
+        # conflict, `=` leaves them at the max 0 and keeps the index usable
+        meta = self.model._meta
+        qn = connection.ops.quote_name
+        table = qn(meta.db_table)
+        pk = qn(meta.pk.column)
+        remver = qn(meta.get_field('remver').column)
+        is_removed = qn(meta.get_field('is_removed').column)
+        key_fields = [meta.get_field(field) for field in (meta.soft_remover.unique_fields or ((),))[0]]
+        columns = [qn(field.column) for field in key_fields]
+        targets, targets_params = queryset.order_by().values('pk').query.get_compiler(connection=connection).as_sql()
+        partition = f'PARTITION BY {", ".join(f"r.{c}" for c in columns)} ' if columns else ''
+        max_remver = (
+            f'(SELECT m.{remver} FROM {table} m '
+            f'WHERE {"".join(f"m.{c} = r.{c} AND " for c in columns)}m.{is_removed} = %s '
+            f'ORDER BY m.{remver} DESC LIMIT 1)'
+        )
+        sets = [f'{qn(meta.get_field(name).column)} = %s' for name in fields]
+        sql = (
+            f'UPDATE {table} SET {", ".join(sets)}, {remver} = s.soft_remover_remver '
+            f'FROM (SELECT r.{pk} AS soft_remover_pk, '
+            f'COALESCE({max_remver}, 0) + ROW_NUMBER() OVER ({partition}ORDER BY r.{pk}) AS soft_remover_remver '
+            f'FROM {table} r WHERE r.{pk} IN ({targets})) s '
+            f'WHERE {table}.{pk} = s.soft_remover_pk'
+        )
+        params = [meta.get_field(name).get_db_prep_save(value, connection=connection) for name, value in fields.items()]
+        params += [True, *targets_params]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount
+
+    def _soft_remover_delete_versioned(self, queryset, **fields):
+        connection = connections[self.db]
+        if self._soft_remover_window_supported(connection):
+            return self._soft_remover_delete_windowed(queryset, connection, **fields)
+
+        key_fields = self.model._meta.soft_remover.key_fields
+        rows = list(queryset.select_for_update().order_by('pk').values_list('pk', *key_fields))
+        if not rows:
+            return 0
+
+        count = 0
+        manager = self.model._base_manager.using(self.db)
+        with _timing(self.model, 'remver_lookup'):
+            pks_by_remver = self._soft_remover_assign_remvers(rows)
+        for remver in sorted(pks_by_remver):
+            for pks in _chunks(pks_by_remver[remver], self.soft_remover_batch_size):
+                count += manager.filter(pk__in=pks).update(remver=remver, **fields)
+        return count
+
+    def _soft_remover_delete(self, **fields):
+        fields = {**self.model._meta.soft_remover.removed_fields(True), **fields}
+        queryset = self.filter(is_removed=False)
+        if self.model._meta.soft_remover.has_remver:
+            retries = self.model._meta.soft_remover.remver_retries
+            for attempt in range(1, retries + 1):
+                try:
+                    with transaction.atomic(using=self.db):
+                        count = self._soft_remover_delete_versioned(queryset, **fields)
+                    break
+                except IntegrityError:
+                    if attempt == retries:
+                        raise
+        else:
+            count = queryset.update(**fields)
+        return count
+
+    def _soft_remover_delete_collected(self):
+        if self.model._meta.soft_remover.cascade:
+            from .deletion import SoftCollector
+
+            collector = SoftCollector(using=self.db)
+            collector.collect(self.model, self.filter(is_removed=False).values_list('pk', flat=True))
+            return collector.delete()[1]
+        count = self._soft_remover_delete()
+        return {self.model._meta.label: count} if count else {}
+
     def delete(self):
-        for obj in self:
-            obj.delete()
+        self._for_write = True
+        if not self.query.can_filter():
+            # Sliced querysets can't be filtered, the rows are resolved first
+            pks = list(self.values_list('pk', flat=True))
+            return self.__class__(self.model, using=self.db).filter(pk__in=pks).delete()
+        pre_soft_delete.send(sender=self.model, instance=None, queryset=self, using=self.db)
+        counts = self._soft_remover_delete_collected()
+        _soft_remover_send(post_soft_delete, 'removed', self.model, None, self.db, counts)
+        return sum(counts.values()), counts
 
     def delete_fully(self):
-        super().delete()
+        count, counts = super().delete()
+        _soft_remover_hard_deleted(self.model, None, counts)
+        return count, counts
 
+    # Async variants run the whole operation with its transaction in one thread hop
+
+    async def adelete(self):
+        return await sync_to_async(self.delete)()
+
+    async def adelete_fully(self):
+        return await sync_to_async(self.delete_fully)()
+
+    def _soft_remover_taken_keys(self, queryset, attnames, keys):
+        taken = set()
+        for chunk in _chunks(list(keys), self.soft_remover_batch_size):
+            rows = queryset.filter(self._soft_remover_keys_filter(attnames, chunk)).order_by().values_list(*attnames)
+            taken.update(rows.distinct())
+        return taken
+
+    def _soft_remover_split_free(self, queryset, rows, taken=None):
+        # `rows` are (pk, *key attnames values), a row is free if its unique keys aren't taken by `queryset`
+        # and by the previous free rows. `taken` keys by unique attnames are updated with the free rows
+        unique_attnames = self.model._meta.soft_remover.unique_attnames
+        key_attnames = sorted({attname for attnames in unique_attnames for attname in attnames})
+        indexes = [tuple(key_attnames.index(attname) + 1 for attname in attnames) for attnames in unique_attnames]
+
+        taken = {} if taken is None else taken
+        for attnames, index in zip(unique_attnames, indexes):
+            keys = {tuple(row[i] for i in index) for row in rows}
+            taken.setdefault(attnames, set()).update(self._soft_remover_taken_keys(queryset, attnames, keys))
+
+        free, skipped = [], []
+        for row in rows:
+            # NULL values never violate unique constraints
+            keys = [(attnames, tuple(row[i] for i in index)) for attnames, index in zip(unique_attnames, indexes)]
+            keys = [(attnames, key) for attnames, key in keys if None not in key]
+            if any(key in taken[attnames] for attnames, key in keys):
+                skipped.append(row[0])
+                continue
+            for attnames, key in keys:
+                taken[attnames].add(key)
+            free.append(row[0])
+        return free, skipped
+
+    def _soft_remover_key_attnames(self):
+        unique_attnames = self.model._meta.soft_remover.unique_attnames
+        return sorted({attname for attnames in unique_attnames for attname in attnames})
+
+    def _soft_remover_split_restorable(self):
+        # Removed rows which can be restored without unique violations (the newest one per unique key),
+        # and the skipped ones. The newest removed version goes first
+        ordering = ('-remver', '-pk') if self.model._meta.soft_remover.has_remver else ('-pk',)
+        removed = self.filter(is_removed=True).order_by(*ordering)
+        rows = list(removed.values_list('pk', *self._soft_remover_key_attnames()))
+        live = self.model._base_manager.using(self.db).filter(is_removed=False)
+        return self._soft_remover_split_free(live, rows)
+
+    def _soft_remover_restore(self, pks):
+        # Returns the numbers of restored rows and primary keys of rows skipped by the cascade by model labels
+        if self.model._meta.soft_remover.cascade:
+            from .deletion import SoftCollector
+
+            collector = SoftCollector(using=self.db)
+            collector.collect(self.model, pks, restore=True)
+            return collector.restore()[1], collector.skipped
+
+        count = 0
+        manager = self.model._base_manager.using(self.db)
+        fields = self.model._meta.soft_remover.removed_fields(False)
+        if self.model._meta.soft_remover.has_remver:
+            fields['remver'] = 0
+        with transaction.atomic(using=self.db, savepoint=False):
+            for chunk in _chunks(sorted(pks), self.soft_remover_batch_size):
+                count += manager.filter(pk__in=chunk).update(**fields)
+        return ({self.model._meta.label: count} if count else {}), {}
 
-class SoftRestorableQuerySet(SoftRemovableQuerySet):
     def restore(self):
-        self.update(is_removed=False)
+        # Returns the number of restored rows and primary keys of removed rows skipped because of unique keys
+        counts, skipped = self._soft_remover_restore_counts()
+        return sum(counts.values()), skipped
+
+    def _soft_remover_restore_counts(self):
+        # Same as `restore()` with the numbers of restored rows by model labels
+        self._for_write = True
+        restored, skipped = self._soft_remover_split_restorable()
+        counts, cascade_skipped = self._soft_remover_restore(restored)
+        skipped += cascade_skipped.get(self.model._meta.label, [])
+        if skipped:
+            cascade_skipped = {**cascade_skipped, self.model._meta.label: sorted(skipped)}
+        _soft_remover_send(post_restore, 'restored', self.model, None, self.db, counts, skipped=cascade_skipped)
+        return counts, skipped
+
+    async def arestore(self):
+        return await sync_to_async(self.restore)()
+
+    def _soft_remover_removed_chunks(self, batch_size):
+        # Primary keys of removed rows in chunks, rows of every chunk may be deleted before the next one
+        queryset = self.filter(is_removed=True).order_by('pk')
+        last_pk = None
+        while True:
+            chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            pks = list(chunk.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            yield pks
+            last_pk = pks[-1]
+
+    def purge(self, batch_size=None, time_budget=None, sleep=0, progress=None):
+        # Hard deletion of removed rows in chunks by primary key, each chunk is deleted in its own transaction.
+        # Rows referenced by live rows stay removed, the deletion would cascade to the live rows
+        self._for_write = True
+        batch_size = batch_size or self.soft_remover_batch_size
+        deadline = time.monotonic() + time_budget if time_budget else None
+        manager = self.model._base_manager.using(self.db)
+        count = 0
+        for chunk in self._soft_remover_removed_chunks(batch_size):
+            with transaction.atomic(using=self.db):
+                referenced = _soft_remover_live_referenced(self.model, chunk, self.db)
+                pks = [pk for pk in chunk if pk not in referenced]
+                _, deleted = manager.filter(pk__in=pks).delete() if pks else (0, {})
+            _soft_remover_hard_deleted(self.model, pks, deleted)
+            count += deleted.get(self.model._meta.label, 0)
+            _increment(self.model, 'purged', deleted.get(self.model._meta.label, 0))
+            if progress is not None:
+                progress(count, chunk[-1])
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            if sleep:
+                time.sleep(sleep)
+        return count
+
+    def removed_changes(self, since=None, chunk_size=None):
+        # Removed rows by keyset pagination over (removed_at, pk), `cursor` of a change resumes after it.
+        # Rows without `removed_at` are skipped. Paging by pk alone would miss later removals of lower pks.
+        if not self.model._meta.soft_remover.has_removed_at:
+            raise ImproperlyConfigured(f'{self.model._meta.label}: removed_changes() requires the removed_at field')
+        return self._soft_remover_removed_changes(since, chunk_size or self.soft_remover_batch_size)
+
+    def _soft_remover_removed_changes(self, since, chunk_size):
+        has_remver = self.model._meta.soft_remover.has_remver
+        queryset = self.filter(is_removed=True, removed_at__isnull=False).order_by('removed_at', 'pk')
+        queryset._for_write = not self.model._meta.soft_remover.replica_reads
+        fields = ('pk', 'remver' if has_remver else 'pk', 'removed_at')
+
+        cursor = since
+        while True:
+            chunk = queryset
+            if cursor is not None:
+                removed_at, pk = cursor
+                chunk = chunk.filter(models.Q(removed_at__gt=removed_at) | models.Q(removed_at=removed_at, pk__gt=pk))
+            count = 0
+            for pk, remver, removed_at in chunk.values_list(*fields)[:chunk_size].iterator():
+                cursor = (removed_at, pk)
+                count += 1
+                yield RemovedChange(pk, remver if has_remver else None, True, removed_at, cursor)
+            if count < chunk_size:
+                break
+
+    def _soft_remover_archive_model(self):
+        archive_model = self.model._meta.soft_remover.archive_model
+        if archive_model is None:
+            raise ImproperlyConfigured(f'{self.model._meta.label}: archive is not enabled by MetaSoftRemover')
+        return archive_model
+
+    def archive(self, batch_size=None):
+        # Moves removed rows into the archive table. Removed rows referencing them by CASCADE are archived first
+        # if their models have the archive, or deleted like by `purge()`. Rows referenced by live rows stay
+        # removed, the deletion would cascade to the live rows
+        return self._soft_remover_archive(batch_size or self.soft_remover_batch_size, set())
+
+    def _soft_remover_archive(self, batch_size, seen):
+        self._for_write = True
+        archive_model = self._soft_remover_archive_model()
+        manager = self.model._base_manager.using(self.db)
+        count = 0
+        for pks in self._soft_remover_removed_chunks(batch_size):
+            with transaction.atomic(using=self.db):
+                referenced = _soft_remover_live_referenced(self.model, pks, self.db)
+                pks = [pk for pk in pks if pk not in referenced and (self.model, pk) not in seen]
+                if not pks:
+                    continue
+                seen.update((self.model, pk) for pk in pks)
+                for rel in get_candidate_relations_to_delete(self.model._meta):
+                    options = getattr(rel.related_model._meta, 'soft_remover', None)
+                    if rel.on_delete is models.CASCADE and options is not None and options.archive:
+                        related = SoftRemovableQuerySet(rel.related_model, using=self.db)
+                        related = related.filter(**{f'{rel.field.name}__pk__in': pks})
+                        related._soft_remover_archive(batch_size, seen)
+                _move_rows(self.model, archive_model, pks, self.db)
+                _, deleted = manager.filter(pk__in=pks).delete()
+            _soft_remover_hard_deleted(self.model, pks, deleted)
+            count += deleted.get(self.model._meta.label, 0)
+            _increment(self.model, 'archived', deleted.get(self.model._meta.label, 0))
+        return count
+
+    def unarchive(self, pks, batch_size=None):
+        # Moves rows back from the archive table as removed ones, rows whose unique keys are taken
+        # by rows of the table stay archived
+        self._for_write = True
+        archive_model = self._soft_remover_archive_model()
+        archived = archive_model._base_manager.using(self.db)
+        count = 0
+        with transaction.atomic(using=self.db, savepoint=False):
+            for chunk in _chunks(sorted(set(pks)), batch_size or self.soft_remover_batch_size):
+                if not self.model._meta.soft_remover.has_remver:
+                    rows = archived.filter(pk__in=chunk).order_by('-pk')
+                    rows = list(rows.values_list('pk', *self._soft_remover_key_attnames()))
+                    chunk, _ = self._soft_remover_split_free(self.model._base_manager.using(self.db), rows)
+                    if chunk:
+                        count += _move_rows(archive_model, self.model, chunk, self.db)
+                else:
+                    # Versions of the archived rows may be taken by rows removed after the archiving
+                    key_fields = self.model._meta.soft_remover.key_fields
+                    rows = list(archived.filter(pk__in=chunk).order_by('pk').values_list('pk', *key_fields))
+                    for remver, remver_pks in sorted(self._soft_remover_assign_remvers(rows).items()):
+                        count += _move_rows(archive_model, self.model, remver_pks, self.db, remver=remver)
+                archived.filter(pk__in=chunk).delete()
+        if count:
+            # The rows are removed ones again
+            removed_ids(self.model).invalidate()
+        return count
+
+    def restore_archived(self, pks):
+        # Same as `restore()` of the rows moved back from the archive, skipped rows include the ones left archived
+        self._for_write = True
+        archive_model = self._soft_remover_archive_model()
+        with transaction.atomic(using=self.db):
+            self.unarchive(pks)
+            count, skipped = self.__class__(self.model, using=self.db).filter(pk__in=pks).restore()
+            archived = archive_model._base_manager.using(self.db).filter(pk__in=pks).values_list('pk', flat=True)
+            return count, sorted([*skipped, *archived])
+
+
+class SoftRestorableQuerySet(SoftRemovableQuerySet):
+    def _soft_remover_removed_pks(self, objs):
+        # Primary keys of removed rows sharing any unique key with each object, newest first
+        removed = self.model._base_manager.using(self.db).filter(is_removed=True)
+        pks = [set() for _ in objs]
+        for attnames in self.model._meta.soft_remover.unique_attnames:
+            indexes_by_key = defaultdict(list)
+            for i, obj in enumerate(objs):
+                if obj.pk is None:
+                    indexes_by_key[tuple(getattr(obj, attname) for attname in attnames)].append(i)
+            for chunk in _chunks(list(indexes_by_key), self.soft_remover_batch_size):
+                rows = removed.filter(self._soft_remover_keys_filter(attnames, chunk)).values_list('pk', *attnames)
+                for pk, *key in rows:
+                    for i in indexes_by_key.get(tuple(key), ()):
+                        pks[i].add(pk)
+        return [sorted(obj_pks, reverse=True) for obj_pks in pks]
+
+    def bulk_create_or_restore(self, objs, batch_size=None):
+        # Same as `save()` of every object: the newest removed row sharing a unique key is restored
+        # instead of inserting the object
+        self._for_write = True
+        objs = list(objs)
+        with transaction.atomic(using=self.db, savepoint=False):
+            restored_pks, created = set(), []
+            for obj, removed_pks in zip(objs, self._soft_remover_removed_pks(objs)):
+                pk = next((pk for pk in removed_pks if pk not in restored_pks), None)
+                if pk is None:
+                    created.append(obj)
+                    continue
+                restored_pks.add(pk)
+                obj.pk = pk
+                obj.is_removed = False
+                obj._state.adding = False
+                obj._state.db = self.db
+
+            manager = self.model._base_manager.using(self.db)
+            for pks in _chunks(sorted(restored_pks), self.soft_remover_batch_size):
+                manager.filter(pk__in=pks).update(**self.model._meta.soft_remover.removed_fields(False))
+            if created and connections[self.db].features.can_return_rows_from_bulk_insert:
+                self.bulk_create(created, batch_size=batch_size)
+            else:
+                # Primary keys of inserted rows aren't returned by the backend, the objects are inserted one by one
+                for obj in created:
+                    obj.save_base(using=self.db, force_insert=True)
+
+        counts = {self.model._meta.label: len(restored_pks)} if restored_pks else {}
+        _soft_remover_send(post_restore, 'restored', self.model, None, self.db, counts, skipped={})
+        _increment(self.model, 'restore_hit', len(restored_pks))
+        _increment(self.model, 'restore_miss', len(created))
+        return objs
+
+    async def abulk_create_or_restore(self, objs, batch_size=None):
+        return await sync_to_async(self.bulk_create_or_restore)(objs, batch_size=batch_size)
 
 
 class SoftRemovableManager(models.Manager):
@@ -29,13 +517,85 @@ class SoftRemovableManager(models.Manager):
     def get_all(self):
         return self._get_query_set()
 
+    def _soft_remover_db_for_write(self):
+        return self._db or router.db_for_write(self.model)
+
+    @property
+    def cached(self):
+        return SoftRemoverCache(self.model)
+
     def get_queryset(self):
         return self._get_query_set().filter(is_removed=False)
 
-    def removed(self):
-        return self._get_query_set().filter(is_removed=True)
+    def removed(self, archived=False):
+        removed = self._get_query_set().filter(is_removed=True)
+        if not archived:
+            return removed
+        # Rows of the archive come as instances of the model, the union allows only ordering and slicing
+        archive_model = removed._soft_remover_archive_model()
+        return removed.union(archive_model._base_manager.using(removed.db).all(), all=True)
+
+    def soft_delete_pks(self, pks, batch_size=None):
+        # Soft deletion by primary keys without loading instances, chunks are deleted in one transaction
+        counts = Counter()
+        batch_size = batch_size or SoftRemovableQuerySet.soft_remover_batch_size
+        using = self._soft_remover_db_for_write()
+        with transaction.atomic(using=using):
+            for chunk in _chunks(sorted(set(pks)), batch_size):
+                counts.update(self.get_all().using(using).filter(pk__in=chunk).delete()[1])
+        return sum(counts.values()), dict(counts)
+
+    def restore_pks(self, pks, batch_size=None):
+        # Same as `restore()` of the rows, chunks go from the newest rows
+        count, skipped = 0, []
+        batch_size = batch_size or SoftRemovableQuerySet.soft_remover_batch_size
+        using = self._soft_remover_db_for_write()
+        with transaction.atomic(using=using):
+            for chunk in _chunks(sorted(set(pks), reverse=True), batch_size):
+                chunk_count, chunk_skipped = self.get_all().using(using).filter(pk__in=chunk).restore()
+                count += chunk_count
+                skipped += chunk_skipped
+        return count, sorted(skipped)
+
+    def archived(self):
+        return self._get_query_set()._soft_remover_archive_model()._base_manager.db_manager(self._db).all()
+
+    def archive(self, older_than=None, batch_size=None):
+        # Archives rows removed more than `older_than` days ago (requires `removed_at`) or all removed rows
+        removed = self.removed()
+        if older_than is not None:
+            removed = self.removed_before(timezone.now() - timedelta(days=older_than))
+        return removed.archive(batch_size=batch_size)
+
+    def unarchive(self, pks, batch_size=None):
+        return self._get_query_set().unarchive(pks, batch_size=batch_size)
+
+    def restore_archived(self, pks):
+        return self._get_query_set().restore_archived(pks)
+
+    def removed_changes(self, since=None, chunk_size=None):
+        return self._get_query_set().removed_changes(since=since, chunk_size=chunk_size)
+
+    def removed_ids(self):
+        return removed_ids(self.model)
+
+    def is_removed_many(self, pks):
+        # {pk: is removed} by the in-process set of removed primary keys, missing rows aren't removed
+        return removed_ids(self.model).contains_many(pks)
+
+    def removed_since(self, since):
+        return self.removed().filter(removed_at__gte=since)
+
+    def removed_before(self, before):
+        return self.removed().filter(removed_at__lt=before)
 
 
 class SoftRestorableManager(SoftRemovableManager):
     def _get_query_set(self):
         return SoftRestorableQuerySet(self.model, using=self._db)
+
+    def bulk_create_or_restore(self, objs, batch_size=None):
+        return self._get_query_set().bulk_create_or_restore(objs, batch_size=batch_size)
+
+    async def abulk_create_or_restore(self, objs, batch_size=None):
+        return await self._get_query_set().abulk_create_or_restore(objs, batch_size=batch_size)
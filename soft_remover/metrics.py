@@ -0,0 +1,60 @@
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.utils.module_loading import import_string
+
+
+__all__ = (
+    'SoftRemoverMetrics',
+    'get_metrics',
+)
+
+
+class SoftRemoverMetrics:
+    """
+    No-op metrics backend. `SOFT_REMOVER_METRICS` setting is a dotted path of a subclass which exports
+    per-model counters (removed, restored, purged, archived, restore_hit, restore_miss, upserted)
+    and timings (remver_lookup) in seconds.
+    """
+
+    def increment(self, model, name, value=1):
+        pass
+
+    def timing(self, model, name, seconds):
+        pass
+
+
+_metrics = None
+
+
+def get_metrics():
+    global _metrics
+    if _metrics is None:
+        path = getattr(settings, 'SOFT_REMOVER_METRICS', None)
+        _metrics = import_string(path)() if path else SoftRemoverMetrics()
+    return _metrics
+
+
+def _reset_metrics(setting, **kwargs):
+    global _metrics
+    if setting == 'SOFT_REMOVER_METRICS':
+        _metrics = None
+
+
+setting_changed.connect(_reset_metrics)
+
+
+def _increment(model, name, value=1):
+    if value:
+        get_metrics().increment(model, name, value)
+
+
+@contextmanager
+def _timing(model, name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        get_metrics().timing(model, name, time.perf_counter() - started)
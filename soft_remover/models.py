@@ -1,10 +1,13 @@
-from itertools import chain
-
-from django.db import transaction, models
-from django.db.models.constraints import BaseConstraint, UniqueConstraint
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, OperationalError, connections, router, transaction, models
 from django.utils.translation import gettext_lazy as _
 
-from .managers import SoftRemovableManager, SoftRestorableManager
+from .archive import create_archive_model
+from .cache import SoftRemoverCache, _get_restore_cache, _soft_remover_connect_cache, _soft_remover_hard_deleted
+from .managers import SoftRemovableManager, SoftRestorableManager, _soft_remover_send
+from .metrics import _increment, _timing
+from .options import SoftRemoverOptions
+from .signals import pre_soft_delete, post_soft_delete, post_restore
 
 
 __all__ = (
@@ -25,34 +28,62 @@ class BaseSoftRemovableModel(models.Model):
 
     @property
     def _soft_remover_unique_fields(self):
-        unique_fields = getattr(self._meta, '_soft_remover_unique_fields', None)
-        if unique_fields is not None:
-            return unique_fields
-
-        def _transform_unique_fields(fields):
-            if not fields:
-                return set()
-            if isinstance(fields[0], str):
-                return {tuple(fields)}
-            elif isinstance(fields[0], BaseConstraint):
-                return {c.fields for c in filter(lambda c: isinstance(c, UniqueConstraint), fields)}
-            return set(fields)
-
-        fieldset = _transform_unique_fields(self._meta.unique_together)
-        fieldset |= _transform_unique_fields(self._meta.constraints)
-        fieldset |= _transform_unique_fields(getattr(getattr(self, 'MetaSoftRemover', None), 'restore_together', []))
-        fieldset |= {(f.name,) for f in self._meta.fields if f.unique and not f.primary_key}
-        if isinstance(self, SoftRemovableModel):
-            fieldset = {tuple(set(f) - {'remver'}) for f in fieldset}
-        self._meta._soft_remover_unique_fields = tuple(fieldset)
-        return self._meta._soft_remover_unique_fields
+        return self._meta.soft_remover.unique_fields
+
+    def _soft_remover_set_removed(self, is_removed):
+        for field, value in self._meta.soft_remover.removed_fields(is_removed).items():
+            setattr(self, field, value)
+
+    def _soft_remover_save(self, using=None):
+        update_fields = self._meta.soft_remover.update_fields
+        if self.pk is None:
+            self.save(using=using)
+        elif self._meta.soft_remover.use_save:
+            self.save(using=using, update_fields=update_fields)
+        else:
+            # Only the soft removal columns are written, `save()` and its signals are skipped
+            using = using or router.db_for_write(self.__class__, instance=self)
+            self.__class__._base_manager.using(using).filter(pk=self.pk).update(
+                **{field: getattr(self, field) for field in update_fields}
+            )
+            self._state.db = using
+
+    def _soft_remover_delete(self, using):
+        # Returns the numbers of removed rows by model labels
+        if not self._meta.soft_remover.cascade:
+            self._soft_remover_set_removed(True)
+            self._soft_remover_save(using=using)
+            return {self._meta.label: 1}
+
+        from .deletion import SoftCollector
+
+        collector = SoftCollector(using=using)
+        collector.collect(self.__class__, [self.pk])
+        with transaction.atomic(using=using):
+            self._soft_remover_set_removed(True)
+            self._soft_remover_save(using=using)
+            counts = collector.delete()[1]
+        # The instance is saved before the collector, so it isn't counted by it
+        counts[self._meta.label] = counts.get(self._meta.label, 0) + 1
+        return counts
 
     def delete(self, using=None, keep_parents=False):
-        self.is_removed = True
-        self.save(using=using)
+        using = using or router.db_for_write(self.__class__, instance=self)
+        pre_soft_delete.send(sender=self.__class__, instance=self, queryset=None, using=using)
+        counts = self._soft_remover_delete(using)
+        _soft_remover_send(post_soft_delete, 'removed', self.__class__, self, using, counts)
 
     def delete_fully(self, using=None, keep_parents=False):
-        super().delete(using=using, keep_parents=keep_parents)
+        pk = self.pk
+        count, counts = super().delete(using=using, keep_parents=keep_parents)
+        _soft_remover_hard_deleted(self.__class__, [pk], counts)
+        return count, counts
+
+    async def adelete(self, using=None, keep_parents=False):
+        return await sync_to_async(self.delete)(using=using, keep_parents=keep_parents)
+
+    async def adelete_fully(self, using=None, keep_parents=False):
+        return await sync_to_async(self.delete_fully)(using=using, keep_parents=keep_parents)
 
 
 class SoftRemovableModel(BaseSoftRemovableModel):
@@ -62,12 +93,31 @@ class SoftRemovableModel(BaseSoftRemovableModel):
         abstract = True
 
     @property
-    def _soft_remover_filter(self):
-        return {field: getattr(self, field) for field in set(chain(*self._soft_remover_unique_fields))}
+    def _soft_remover_filters(self):
+        return self._meta.soft_remover.filters(self)
 
-    def delete(self, using=None, keep_parents=False):
-        self.remver = self.__class__.objects.removed().filter(**self._soft_remover_filter).count() + 1
-        super().delete(using=using, keep_parents=keep_parents)
+    def _soft_remover_next_remver(self, using):
+        # Each lookup is covered by the index of the unique constraint (fields..., remver)
+        removed = self.__class__._base_manager.using(using).filter(is_removed=True).select_for_update()
+        remvers = (
+            removed.filter(**lookup).order_by('-remver').values_list('remver', flat=True).first()
+            for lookup in self._soft_remover_filters
+        )
+        return max(remver or 0 for remver in remvers) + 1
+
+    def _soft_remover_delete(self, using):
+        retries = self._meta.soft_remover.remver_retries
+        is_removed, remver = self.is_removed, self.remver
+        for attempt in range(1, retries + 1):
+            try:
+                with transaction.atomic(using=using):
+                    with _timing(self.__class__, 'remver_lookup'):
+                        self.remver = self._soft_remover_next_remver(using)
+                    return super()._soft_remover_delete(using)
+            except Exception as e:
+                self.is_removed, self.remver = is_removed, remver
+                if not isinstance(e, IntegrityError) or attempt == retries:
+                    raise
 
 
 class SoftRestorableModel(BaseSoftRemovableModel):
@@ -78,30 +128,170 @@ class SoftRestorableModel(BaseSoftRemovableModel):
 
     @property
     def _soft_remover_filter(self):
-        q = models.Q()
-        for fields in self._soft_remover_unique_fields:
-            cq = models.Q()
-            for field in fields:
-                cq &= models.Q(**{field: getattr(self, field)})
-            q |= cq
-        return q
+        return self._meta.soft_remover.filter(self)
+
+    def _soft_remover_restore(self, using):
+        # Returns the numbers of restored rows and primary keys of rows skipped by the cascade by model labels
+        if not self._meta.soft_remover.cascade:
+            self._soft_remover_set_removed(False)
+            self._soft_remover_save(using=using)
+            return {self._meta.label: 1}, {}
+
+        from .deletion import SoftCollector
+
+        collector = SoftCollector(using=using)
+        collector.collect(self.__class__, [self.pk], restore=True)
+        with transaction.atomic(using=using):
+            self._soft_remover_set_removed(False)
+            self._soft_remover_save(using=using)
+            counts = collector.restore()[1]
+        counts[self._meta.label] = counts.get(self._meta.label, 0) + 1
+        return counts, collector.skipped
 
     def restore(self, using=None):
-        self.is_removed = False
-        self.save(using=using)
+        using = using or router.db_for_write(self.__class__, instance=self)
+        counts, skipped = self._soft_remover_restore(using)
+        _soft_remover_send(post_restore, 'restored', self.__class__, self, using, counts, skipped=skipped)
+
+    async def arestore(self, using=None):
+        return await sync_to_async(self.restore)(using=using)
+
+    def _soft_remover_upsert(self, using=None):
+        # Returns whether a removed row is restored, None if UPSERT isn't used
+        if not self._meta.soft_remover.upsert:
+            return None
+
+        conflict_fields = self._meta.soft_remover.conflict_fields
+        using = using or router.db_for_write(self.__class__, instance=self)
+        connection = connections[using]
+        if (
+            conflict_fields is None
+            or self._meta.parents
+            or self._meta.auto_field is None
+            or connection.vendor not in ('postgresql', 'sqlite')
+            or not connection.features.can_return_columns_from_insert
+        ):
+            return None
+
+        meta = self._meta
+        qn = connection.ops.quote_name
+        table = qn(meta.db_table)
+        is_removed = qn(meta.get_field('is_removed').column)
+        restored = self._meta.soft_remover.removed_fields(False)
+        fields = [f for f in meta.local_concrete_fields if f is not meta.auto_field]
+        values = [f.get_db_prep_save(f.pre_save(self, True), connection=connection) for f in fields]
+        pk = f'{table}.{qn(meta.pk.column)}'
+        if connection.vendor == 'postgresql':
+            inserted, inserted_params = f'{table}.xmax = 0', []
+        else:
+            # An inserted row takes a key above the AUTOINCREMENT sequence as it was before the statement
+            inserted = f'{pk} > COALESCE((SELECT seq FROM sqlite_sequence WHERE name = %s), 0)'
+            inserted_params = [meta.db_table]
+        sql = (
+            f'INSERT INTO {table} ({", ".join(qn(f.column) for f in fields)}) '
+            f'VALUES ({", ".join(["%s"] * len(fields))}) '
+            f'ON CONFLICT ({", ".join(qn(meta.get_field(f).column) for f in conflict_fields)}) '
+            f'DO UPDATE SET {", ".join(f"{qn(meta.get_field(f).column)} = %s" for f in restored)} '
+            f'WHERE {table}.{is_removed} = %s '
+            f'RETURNING {pk}, {inserted}'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, values + list(restored.values()) + [True] + inserted_params)
+            row = cursor.fetchone()
+        if row is None:
+            # The conflicting row isn't removed
+            raise IntegrityError(f'UNIQUE constraint failed: {meta.db_table}.{", ".join(conflict_fields)}')
+
+        self.pk = row[0]
+        self._state.adding = False
+        self._state.db = using
+        return not row[1]
+
+    def _soft_remover_restore_candidates(self, using):
+        # The probe goes to the database of the write, a replica may lag behind it
+        removed = self.__class__.objects.db_manager(using).removed()
+        lock = self._meta.soft_remover.restore_lock
+        if lock is None:
+            return removed
+        if lock == 'advisory':
+            connection = connections[using]
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    for key in self._meta.soft_remover.lock_keys(self):
+                        cursor.execute('SELECT pg_advisory_xact_lock(%s)', [key])
+                return removed
+            lock = 'wait'
+        return removed.select_for_update(nowait=lock == 'nowait', skip_locked=lock == 'skip_locked')
+
+    def _soft_remover_save_or_restore(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(self.__class__, instance=self)
+        with transaction.atomic(using=using):
+            if not self.pk:
+                _soft_remover_filter = self._soft_remover_filter
+                if _soft_remover_filter:
+                    try:
+                        candidates = self._soft_remover_restore_candidates(using)
+                        cache = _get_restore_cache(self.__class__)
+                        if cache is None or cache.using != using:
+                            instance = candidates.filter(_soft_remover_filter).order_by('-pk').first()
+                        else:
+                            pk = cache.lookup(self)
+                            instance = candidates.filter(pk=pk).first() if pk is not None else None
+                        if instance is None:
+                            raise self.DoesNotExist()
+                        instance.restore(using=using)
+                        self.pk = instance.pk
+                        _increment(self.__class__, 'restore_hit')
+                        return
+                    except self.DoesNotExist:
+                        _increment(self.__class__, 'restore_miss')
+            super().save(*args, **kwargs)
 
-    @transaction.atomic
     def save(self, *args, **kwargs):
-        if not self.pk:
-            _soft_remover_filter = self._soft_remover_filter
-            if _soft_remover_filter:
-                try:
-                    instance = self.__class__.objects.removed().filter(_soft_remover_filter).order_by('-pk').first()
-                    if instance is None:
-                        raise self.DoesNotExist()
-                    instance.restore()
-                    self.pk = instance.pk
-                    return
-                except self.DoesNotExist:
-                    ...
-        super().save(*args, **kwargs)
+        restored = None if self.pk else self._soft_remover_upsert(using=kwargs.get('using'))
+        if restored is not None:
+            # Same signal and counters as restoring by the lookup
+            _increment(self.__class__, 'upserted')
+            _increment(self.__class__, 'restore_hit' if restored else 'restore_miss')
+            if restored:
+                counts = {self._meta.label: 1}
+                _soft_remover_send(post_restore, 'restored', self.__class__, self, self._state.db, counts, skipped={})
+            if self._meta.soft_remover.cache is not None:
+                SoftRemoverCache(self.__class__).invalidate(self)
+            return
+
+        if self.pk or self._meta.soft_remover.restore_lock is None:
+            return self._soft_remover_save_or_restore(*args, **kwargs)
+
+        # A removed row is restored by one of concurrent saves, the others are retried
+        retries = self._meta.soft_remover.restore_retries
+        for attempt in range(1, retries + 1):
+            try:
+                return self._soft_remover_save_or_restore(*args, **kwargs)
+            except (IntegrityError, OperationalError):
+                self.pk = None
+                if attempt == retries:
+                    raise
+
+    async def asave(self, *args, **kwargs):
+        return await sync_to_async(self.save)(*args, **kwargs)
+
+
+def _soft_remover_class_prepared(sender, **kwargs):
+    if not issubclass(sender, BaseSoftRemovableModel):
+        return
+    sender._meta.soft_remover = SoftRemoverOptions(sender)
+    # Proxies share the table and the indexes of the concrete model
+    if sender._meta.soft_remover.live_indexes and not sender._meta.proxy:
+        sender._meta.soft_remover.add_live_indexes(restorable=issubclass(sender, SoftRestorableModel))
+    if sender._meta.soft_remover.archive:
+        if sender._meta.proxy:
+            archive_model = sender._meta.concrete_model._meta.soft_remover.archive_model
+        else:
+            archive_model = create_archive_model(sender)
+        sender._meta.soft_remover.archive_model = archive_model
+    if sender._meta.soft_remover.cache is not None:
+        _soft_remover_connect_cache(sender)
+
+
+models.signals.class_prepared.connect(_soft_remover_class_prepared)
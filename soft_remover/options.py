@@ -0,0 +1,190 @@
+import hashlib
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db import models, router
+from django.db.models.constraints import BaseConstraint, UniqueConstraint
+from django.utils import timezone
+
+
+__all__ = (
+    'SoftRemoverOptions',
+)
+
+
+DEFAULT_NAMES = (
+    'restore_together',
+    'remver_retries',
+    'use_save',
+    'upsert',
+    'live_indexes',
+    'cascade',
+    'archive',
+    'restore_lock',
+    'restore_retries',
+    'cache',
+    'cache_timeout',
+    'removed_ids_ttl',
+    'replica_reads',
+)
+REMVER_RETRIES = 3
+RESTORE_RETRIES = 3
+RESTORE_LOCKS = (None, 'wait', 'nowait', 'skip_locked', 'advisory')
+CASCADE_FIELD = 'removed_by_cascade'
+
+
+def _transform_unique_fields(fields):
+    if not fields:
+        return set()
+    if isinstance(fields[0], str):
+        return {tuple(fields)}
+    elif isinstance(fields[0], BaseConstraint):
+        return {c.fields for c in filter(lambda c: isinstance(c, UniqueConstraint), fields)}
+    return set(map(tuple, fields))
+
+
+class SoftRemoverOptions:
+    """
+    Soft remover metadata of a model (`Model._meta.soft_remover`), computed once when the model class is prepared.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.restore_together = ()
+        self.remver_retries = REMVER_RETRIES
+        self.use_save = False
+        self.upsert = False
+        self.live_indexes = False
+        self.cascade = False
+        self.archive = False
+        self.restore_lock = None
+        self.restore_retries = RESTORE_RETRIES
+        # Alias of the cache of `objects.cached`
+        self.cache = None
+        self.cache_timeout = DEFAULT_TIMEOUT
+        # Seconds between refreshes of `objects.removed_ids()`, None for the soft removal signals only
+        self.removed_ids_ttl = 60
+        # Reads not followed by writes (`cached`, `removed_ids()`, `removed_changes()`) may go to the router's
+        # read database, all the others go to the write database
+        self.replica_reads = False
+        # Set when the model class is prepared
+        self.archive_model = None
+
+        meta = getattr(model, 'MetaSoftRemover', None)
+        if meta is not None:
+            for name in (name for name in dir(meta) if not name.startswith('_')):
+                if name not in DEFAULT_NAMES:
+                    raise ImproperlyConfigured(f"{self.label}: 'class MetaSoftRemover' got invalid attribute '{name}'")
+                setattr(self, name, getattr(meta, name))
+        self.restore_together = tuple(sorted(_transform_unique_fields(self.restore_together)))
+        if self.restore_lock not in RESTORE_LOCKS:
+            raise ImproperlyConfigured(f"{self.label}: 'restore_lock' must be one of {RESTORE_LOCKS}")
+
+        opts = model._meta
+        self.fields = frozenset(f.name for f in opts.concrete_fields)
+        self.has_remver = 'remver' in self.fields
+        self.has_removed_at = 'removed_at' in self.fields
+        self.has_cascade_field = CASCADE_FIELD in self.fields
+
+        fieldset = _transform_unique_fields(opts.unique_together)
+        fieldset |= _transform_unique_fields(opts.constraints)
+        fieldset |= set(self.restore_together)
+        fieldset |= {(f.name,) for f in opts.fields if f.unique and not f.primary_key}
+        if self.has_remver:
+            fieldset = {tuple(field for field in f if field != 'remver') for f in fieldset}
+        self.unique_fields = tuple(sorted(fieldset))
+        self.unique_attnames = tuple(tuple(self._get_field(field).attname for field in f) for f in self.unique_fields)
+        self.key_fields = tuple(sorted({field for f in self.unique_fields for field in f}))
+
+        self.update_fields = ('is_removed',)
+        if self.has_remver:
+            self.update_fields += ('remver',)
+        if self.has_removed_at:
+            self.update_fields += ('removed_at',)
+        if self.has_cascade_field:
+            self.update_fields += (CASCADE_FIELD,)
+
+        # ON CONFLICT needs exactly one unique index, `restore_together` may be not backed by any,
+        # partial and deferrable unique constraints can't be conflict targets
+        self.conflict_fields = None
+        if len(self.unique_fields) == 1 and not self.restore_together:
+            indexed = _transform_unique_fields(opts.unique_together)
+            indexed |= {(f.name,) for f in opts.fields if f.unique and not f.primary_key}
+            indexed |= {
+                tuple(c.fields) for c in opts.constraints
+                if isinstance(c, UniqueConstraint) and c.condition is None and getattr(c, 'deferrable', None) is None
+            }
+            if self.unique_fields[0] in indexed:
+                self.conflict_fields = self.unique_fields[0]
+
+    @property
+    def label(self):
+        return self.model._meta.label
+
+    def _get_field(self, name):
+        try:
+            return self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise ImproperlyConfigured(f"{self.label}: unique fields refer to the nonexistent field '{name}'")
+
+    def has_field(self, name):
+        return name in self.fields
+
+    def db_for_read(self):
+        if self.replica_reads:
+            return router.db_for_read(self.model)
+        return router.db_for_write(self.model)
+
+    def removed_fields(self, is_removed):
+        # Values of the soft removal columns, `removed_at` is maintained if a model has it. Rows removed
+        # or restored directly aren't marked as removed by the cascade, the collector marks its rows
+        fields = {'is_removed': is_removed}
+        if self.has_removed_at:
+            fields['removed_at'] = timezone.now() if is_removed else None
+        if self.has_cascade_field:
+            fields[CASCADE_FIELD] = False
+        return fields
+
+    def filters(self, obj):
+        # Lookups of every unique key by values of the object
+        return [
+            {attname: getattr(obj, attname) for attname in attnames} for attnames in self.unique_attnames or ((),)
+        ]
+
+    def filter(self, obj):
+        q = models.Q()
+        for attnames in self.unique_attnames:
+            q |= models.Q(**{attname: getattr(obj, attname) for attname in attnames})
+        return q
+
+    def lock_keys(self, obj):
+        # Advisory lock keys (signed 64-bit) of the unique keys of the object, sorted to avoid deadlocks
+        keys = set()
+        for attnames in self.unique_attnames:
+            value = repr((self.label, attnames, tuple(getattr(obj, attname) for attname in attnames)))
+            keys.add(int.from_bytes(hashlib.sha1(value.encode()).digest()[:8], 'big', signed=True))
+        return sorted(keys)
+
+    def add_live_indexes(self, restorable):
+        opts = self.model._meta
+        live = models.Q(is_removed=False)
+
+        def _name(*fields):
+            digest = hashlib.sha1('_'.join((opts.db_table, *fields)).encode()).hexdigest()[:8]
+            return f'{opts.db_table[:15]}_{digest}_sr'
+
+        # Unlike unique indexes restore_together isn't enforced by the database
+        restore_together = set(self.restore_together) if restorable else set()
+        indexes = [models.Index(fields=[opts.pk.name], condition=live, name=_name(opts.pk.name))]
+        for fields in self.unique_fields:
+            if fields and fields not in restore_together:
+                indexes.append(models.Index(fields=list(fields), condition=live, name=_name(*fields)))
+        constraints = [
+            UniqueConstraint(fields=list(fields), condition=live, name=_name('unique', *fields))
+            for fields in sorted(restore_together)
+        ]
+
+        # Migrations take options from `original_attrs`
+        opts.indexes = opts.original_attrs['indexes'] = [*opts.indexes, *indexes]
+        if constraints:
+            opts.constraints = opts.original_attrs['constraints'] = [*opts.constraints, *constraints]
@@ -0,0 +1,15 @@
+from django.dispatch import Signal
+
+
+__all__ = (
+    'pre_soft_delete',
+    'post_soft_delete',
+    'post_restore',
+)
+
+
+# Arguments: sender (model), instance (None for querysets), queryset (None for instances), using
+pre_soft_delete = Signal()
+# Arguments: sender, instance, using, count (rows of the sender)
+post_soft_delete = Signal()
+post_restore = Signal()
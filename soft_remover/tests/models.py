@@ -18,6 +18,14 @@ class SimpleUniqueRem(SoftRemovableModel, TestModelWithDefaultManager):
     name = models.CharField(max_length=32, unique=True)
 
 
+class NullUniqueTogetherRem(SoftRemovableModel, TestModelWithDefaultManager):
+    category = models.CharField(max_length=32)
+    name = models.CharField(max_length=32, null=True)
+
+    class Meta:
+        unique_together = ('category', 'name', 'remver')
+
+
 class SimpleUniqueRem2(SoftRemovableModel, TestModelWithDefaultManager):
     name = models.CharField(max_length=32)
 
@@ -186,3 +194,144 @@ class ManyRestoreTogetherRes(SoftRestorableModel, TestModelWithDefaultManager):
 
     class MetaSoftRemover:
         restore_together = ('category', 'name',)
+
+
+class UseSaveRes(SoftRestorableModel, TestModelWithDefaultManager):
+    name = models.CharField(max_length=32, unique=True)
+
+    class MetaSoftRemover:
+        use_save = True
+
+
+class UpsertRes(SoftRestorableModel, TestModelWithDefaultManager):
+    category = models.CharField(max_length=32)
+    name = models.CharField(max_length=32)
+    value = models.PositiveSmallIntegerField()
+
+    class Meta:
+        unique_together = ('category', 'name')
+
+    class MetaSoftRemover:
+        upsert = True
+
+
+class PartialUpsertRes(SoftRestorableModel, TestModelWithDefaultManager):
+    name = models.CharField(max_length=32)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=('name',), condition=models.Q(is_removed=False), name='dsr_pures_name'),
+        ]
+
+    class MetaSoftRemover:
+        upsert = True
+
+
+class LiveIndexesRem(SoftRemovableModel, TestModelWithDefaultManager):
+    category = models.CharField(max_length=32)
+    name = models.CharField(max_length=32)
+
+    class Meta:
+        unique_together = ('category', 'name', 'remver')
+
+    class MetaSoftRemover:
+        live_indexes = True
+
+
+class LiveIndexesProxyRem(LiveIndexesRem):
+    class Meta:
+        proxy = True
+
+
+class LiveIndexesRes(SoftRestorableModel, TestModelWithDefaultManager):
+    category = models.CharField(max_length=32)
+    name = models.CharField(max_length=32)
+
+    class MetaSoftRemover:
+        restore_together = ('category', 'name')
+        live_indexes = True
+
+
+class CascadeRes(SoftRestorableModel, TestModelWithDefaultManager):
+    name = models.CharField(max_length=32, unique=True)
+
+    class MetaSoftRemover:
+        cascade = True
+
+
+class CascadeChildRem(SoftRemovableModel, TestModelWithDefaultManager):
+    parent = models.ForeignKey(CascadeRes, on_delete=models.CASCADE, related_name='children')
+    name = models.CharField(max_length=32)
+    removed_by_cascade = models.BooleanField(default=False, editable=False)
+
+    class Meta:
+        unique_together = ('parent', 'name', 'remver')
+
+
+class CascadeGrandChildRes(SoftRestorableModel, TestModelWithDefaultManager):
+    parent = models.ForeignKey(CascadeChildRem, on_delete=models.CASCADE, related_name='children')
+    removed_by_cascade = models.BooleanField(default=False, editable=False)
+
+
+class CascadeProtectedRes(SoftRestorableModel, TestModelWithDefaultManager):
+    parent = models.ForeignKey(CascadeRes, on_delete=models.PROTECT, null=True, related_name='protected')
+
+
+class RemovedAtRem(SoftRemovableModel, TestModelWithDefaultManager):
+    name = models.CharField(max_length=32)
+    removed_at = models.DateTimeField(null=True, editable=False, db_index=True)
+
+    class Meta:
+        unique_together = ('name', 'remver')
+
+
+class RemovedAtRes(SoftRestorableModel, TestModelWithDefaultManager):
+    name = models.CharField(max_length=32, unique=True)
+    removed_at = models.DateTimeField(null=True, editable=False, db_index=True)
+
+    class MetaSoftRemover:
+        upsert = True
+
+
+class ArchiveRem(SoftRemovableModel, TestModelWithDefaultManager):
+    name = models.CharField(max_length=32)
+    removed_at = models.DateTimeField(null=True, editable=False, db_index=True)
+
+    class Meta:
+        unique_together = ('name', 'remver')
+
+    class MetaSoftRemover:
+        archive = True
+
+
+class ArchiveRes(SoftRestorableModel, TestModelWithDefaultManager):
+    name = models.CharField(max_length=32, unique=True)
+
+    class MetaSoftRemover:
+        archive = True
+
+
+class ArchiveProfileRes(SoftRestorableModel, TestModelWithDefaultManager):
+    owner = models.OneToOneField(ArchiveRes, on_delete=models.CASCADE, related_name='profile')
+
+    class MetaSoftRemover:
+        archive = True
+
+
+class RestoreLockRes(SoftRestorableModel, TestModelWithDefaultManager):
+    name = models.CharField(max_length=32)
+
+    class MetaSoftRemover:
+        restore_together = ('name',)
+        restore_lock = 'skip_locked'
+
+
+class CachedRes(SoftRestorableModel, TestModelWithDefaultManager):
+    category = models.CharField(max_length=32)
+    name = models.CharField(max_length=32)
+
+    class Meta:
+        unique_together = ('category', 'name')
+
+    class MetaSoftRemover:
+        cache = 'default'
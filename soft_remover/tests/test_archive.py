@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+
+from .models import SimpleRes, ArchiveRem, ArchiveRes, ArchiveProfileRes
+
+
+class TestSoftRemoverArchive(TestCase):
+    def test_archive_model(self):
+        archive_model = ArchiveRem._meta.soft_remover.archive_model
+        self.assertEqual(archive_model.__name__, 'ArchiveRemArchive')
+        self.assertEqual(archive_model._meta.db_table, f'{ArchiveRem._meta.db_table}_archive')
+        self.assertEqual(archive_model._meta.unique_together, ())
+        self.assertIsNone(SimpleRes._meta.soft_remover.archive_model)
+
+        with self.assertRaises(ImproperlyConfigured):
+            SimpleRes.objects.archive()
+
+    def test_archive(self):
+        objs = [ArchiveRes.objects.create(name=f'TestName{i}') for i in range(3)]
+        ArchiveRes.objects.exclude(pk=objs[2].pk).delete()
+
+        self.assertTrue(ArchiveRes.objects.archive(batch_size=1) == 2)
+        self.assertTrue(ArchiveRes.all_objects.count() == 1)
+        self.assertEqual(set(ArchiveRes.objects.archived().values_list('pk', flat=True)), {objs[0].pk, objs[1].pk})
+
+        removed = ArchiveRes.objects.removed(archived=True).order_by('pk')
+        self.assertEqual([obj.pk for obj in removed], [objs[0].pk, objs[1].pk])
+        self.assertTrue(all(isinstance(obj, ArchiveRes) and obj.is_removed for obj in removed))
+
+        ArchiveRes.objects.create(name='TestName1')
+        self.assertEqual(ArchiveRes.objects.restore_archived([objs[0].pk, objs[1].pk]), (1, [objs[1].pk]))
+        self.assertTrue(ArchiveRes.objects.filter(pk=objs[0].pk).exists())
+        # The unique key is taken by the live row
+        self.assertEqual(list(ArchiveRes.objects.archived().values_list('pk', flat=True)), [objs[1].pk])
+
+    def test_older_than(self):
+        ArchiveRem.objects.create(name='TestName').delete()
+        ArchiveRem.objects.create(name='TestName').delete()
+        old = ArchiveRem.objects.removed().order_by('pk').first()
+        ArchiveRem.all_objects.filter(pk=old.pk).update(removed_at=old.removed_at - timedelta(days=10))
+
+        self.assertTrue(ArchiveRem.objects.archive(older_than=5) == 1)
+        self.assertEqual(list(ArchiveRem.objects.archived().values_list('pk', 'remver')), [(old.pk, 1)])
+
+        # The version of the archived row is taken by the removed rows
+        ArchiveRem.objects.create(name='TestName').delete()
+        self.assertTrue(ArchiveRem.objects.unarchive([old.pk]) == 1)
+        self.assertEqual(ArchiveRem.objects.removed().get(pk=old.pk).remver, 4)
+
+    def test_live_references(self):
+        owners = [ArchiveRes.objects.create(name=f'TestName{i}') for i in range(3)]
+        live = ArchiveProfileRes.objects.create(owner=owners[0])
+        removed = ArchiveProfileRes.objects.create(owner=owners[1])
+        removed.delete()
+        ArchiveRes.objects.all().delete()
+
+        # The removed owner of the live profile stays removed, the removed profile is archived before its owner
+        self.assertTrue(ArchiveRes.objects.archive() == 2)
+        self.assertEqual(list(ArchiveRes.objects.removed().values_list('pk', flat=True)), [owners[0].pk])
+        self.assertTrue(ArchiveProfileRes.objects.filter(pk=live.pk).exists())
+        self.assertFalse(ArchiveProfileRes.all_objects.filter(pk=removed.pk).exists())
+        self.assertEqual(list(ArchiveProfileRes.objects.archived().values_list('pk', flat=True)), [removed.pk])
+
+        self.assertEqual(ArchiveRes.objects.restore_archived([owners[1].pk]), (1, []))
+        self.assertEqual(ArchiveProfileRes.objects.restore_archived([removed.pk]), (1, []))
+        self.assertTrue(ArchiveRes.objects.get(pk=owners[1].pk).profile.pk == removed.pk)
+
+    def test_one_to_one(self):
+        archive_model = ArchiveProfileRes._meta.soft_remover.archive_model
+        field = archive_model._meta.get_field('owner')
+        self.assertFalse(field.unique)
+        self.assertFalse(field.one_to_one)
+
+        owner = ArchiveRes.objects.create(name='TestName')
+        for _ in range(2):
+            ArchiveProfileRes.objects.create(owner=owner).delete()
+            self.assertTrue(ArchiveProfileRes.objects.archive() == 1)
+        self.assertTrue(ArchiveProfileRes.objects.archived().filter(owner=owner).count() == 2)
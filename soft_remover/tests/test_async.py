@@ -0,0 +1,48 @@
+from asgiref.sync import async_to_sync
+from django.test import TestCase
+
+from .models import UniqueTogetherRem, UniqueTogetherRes, RestoreTogetherRes
+
+
+class TestSoftRemoverAsync(TestCase):
+    def test_remove(self):
+        obj = UniqueTogetherRem.objects.create(category='TestCategory', name='TestName', value=0)
+        async_to_sync(obj.adelete)()
+        UniqueTogetherRem.objects.create(category='TestCategory', name='TestName', value=1)
+        result = async_to_sync(UniqueTogetherRem.objects.all().adelete)()
+
+        self.assertEqual(result, (1, {'tests.UniqueTogetherRem': 1}))
+        self.assertEqual(sorted(UniqueTogetherRem.objects.removed().values_list('remver', flat=True)), [1, 2])
+
+        async_to_sync(UniqueTogetherRem.objects.removed().arestore)()
+        self.assertTrue(UniqueTogetherRem.objects.get(name='TestName').value == 1)
+
+        async_to_sync(UniqueTogetherRem.objects.get_all().adelete_fully)()
+        self.assertTrue(UniqueTogetherRem.all_objects.count() == 0)
+
+    def test_restore(self):
+        obj = UniqueTogetherRes.objects.create(category='TestCategory', name='TestName', value=0)
+        async_to_sync(obj.adelete)()
+        self.assertTrue(UniqueTogetherRes.objects.removed().count() == 1)
+
+        async_to_sync(obj.arestore)()
+        self.assertTrue(UniqueTogetherRes.objects.all().count() == 1)
+
+        async_to_sync(obj.adelete)()
+        obj2 = UniqueTogetherRes(category='TestCategory', name='TestName', value=1)
+        async_to_sync(obj2.asave)()
+        self.assertEqual(obj2.pk, obj.pk)
+        self.assertTrue(UniqueTogetherRes.all_objects.count() == 1)
+
+        async_to_sync(obj2.adelete_fully)()
+        self.assertTrue(UniqueTogetherRes.all_objects.count() == 0)
+
+    def test_bulk_create_or_restore(self):
+        obj = RestoreTogetherRes.objects.create(name='TestName1')
+        obj.delete()
+
+        objs = async_to_sync(RestoreTogetherRes.objects.abulk_create_or_restore)(
+            [RestoreTogetherRes(name='TestName1'), RestoreTogetherRes(name='TestName2')]
+        )
+        self.assertEqual(objs[0].pk, obj.pk)
+        self.assertTrue(RestoreTogetherRes.objects.all().count() == 2)
@@ -0,0 +1,187 @@
+import json
+import os
+import time
+import timeit
+import unittest
+
+from django.db import connection, models
+from django.db.models.constraints import BaseConstraint, UniqueConstraint
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .models import UniqueTogetherRem, ManyUniqueTogetherRem, ManyUniqueTogetherRes2
+
+
+# SOFT_REMOVER_BENCHMARK=1 python manage.py test soft_remover.tests.test_benchmark
+# SOFT_REMOVER_BENCHMARK_SAVE=<path> writes the results, SOFT_REMOVER_BENCHMARK_BASELINE=<path> fails on
+# more queries than in the baseline or on the time exceeding the baseline by SOFT_REMOVER_BENCHMARK_THRESHOLD
+BENCHMARK = bool(os.environ.get('SOFT_REMOVER_BENCHMARK'))
+SIZES = [int(size) for size in os.environ.get('SOFT_REMOVER_BENCHMARK_SIZES', '1000,10000,100000').split(',')]
+DEPTHS = [int(depth) for depth in os.environ.get('SOFT_REMOVER_BENCHMARK_DEPTHS', '0,10').split(',')]
+THRESHOLD = float(os.environ.get('SOFT_REMOVER_BENCHMARK_THRESHOLD', '0.5'))
+SAVE = os.environ.get('SOFT_REMOVER_BENCHMARK_SAVE')
+BASELINE = os.environ.get('SOFT_REMOVER_BENCHMARK_BASELINE')
+# Rows of single-row operations
+SAMPLE = 100
+BATCH_SIZE = 1000
+# Calls of metadata micro-benchmarks
+CALLS = int(os.environ.get('SOFT_REMOVER_BENCHMARK_CALLS', '10000'))
+
+
+def _objs(model, size, depth=0, offset=0):
+    # Removed versions 1..depth of every key, then live rows
+    for remver in (*range(1, depth + 1), 0):
+        for i in range(offset, offset + size):
+            fields = {'category': 'TestCategory', 'name': f'TestName{i}', 'value': 0}
+            if model._meta.soft_remover.has_field('tag'):
+                fields['tag'] = f'tag{i}'
+            if remver:
+                fields['is_removed'] = True
+                if model._meta.soft_remover.has_remver:
+                    fields['remver'] = remver
+            yield model(**fields)
+
+
+def _rebuilt_filters(obj):
+    # Unique keys and lookups rebuilt from `_meta` by every call, as before `_meta.soft_remover`
+    def _transform_unique_fields(fields):
+        if not fields:
+            return set()
+        if isinstance(fields[0], str):
+            return {tuple(fields)}
+        elif isinstance(fields[0], BaseConstraint):
+            return {c.fields for c in filter(lambda c: isinstance(c, UniqueConstraint), fields)}
+        return set(fields)
+
+    meta = obj._meta
+    fieldset = _transform_unique_fields(meta.unique_together)
+    fieldset |= _transform_unique_fields(meta.constraints)
+    fieldset |= _transform_unique_fields(getattr(getattr(obj, 'MetaSoftRemover', None), 'restore_together', []))
+    fieldset |= {(f.name,) for f in meta.fields if f.unique and not f.primary_key}
+    unique_fields = tuple(sorted({tuple(field for field in f if field != 'remver') for f in fieldset}))
+    filters = [{field: getattr(obj, field) for field in fields} for fields in unique_fields or ((),)]
+    q = models.Q()
+    for fields in unique_fields:
+        cq = models.Q()
+        for field in fields:
+            cq &= models.Q(**{field: getattr(obj, field)})
+        q |= cq
+    return filters, q
+
+
+@unittest.skipUnless(BENCHMARK, 'SOFT_REMOVER_BENCHMARK is not set')
+class TestSoftRemoverBenchmark(TestCase):
+    results = {}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.baseline = {}
+        if BASELINE:
+            with open(BASELINE) as f:
+                cls.baseline = json.load(f)
+
+    @classmethod
+    def tearDownClass(cls):
+        if SAVE:
+            with open(SAVE, 'w') as f:
+                json.dump(cls.results, f, indent=2, sort_keys=True)
+        super().tearDownClass()
+
+    def _fill(self, model, size, depth):
+        model._base_manager.all().delete()
+        # Keys of the restorable models are unique among removed rows too, history is other keys
+        if model._meta.soft_remover.has_remver:
+            model._base_manager.bulk_create(_objs(model, size, depth), batch_size=BATCH_SIZE)
+        else:
+            model._base_manager.bulk_create(_objs(model, size), batch_size=BATCH_SIZE)
+            history = list(_objs(model, size * depth, offset=size))
+            for obj in history:
+                obj.is_removed = True
+            model._base_manager.bulk_create(history, batch_size=BATCH_SIZE)
+
+    def _measure(self, name, size, depth, func):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+        key = f'{name}:{size}:{depth}'
+        result = self.results[key] = {'queries': len(queries), 'seconds': round(elapsed, 4)}
+        print(f'\n{key}: {result["queries"]} queries, {elapsed:.3f}s', end='')
+
+        baseline = self.baseline.get(key)
+        if baseline is not None:
+            self.assertLessEqual(result['queries'], baseline['queries'], key)
+            self.assertLessEqual(elapsed, baseline['seconds'] * (1 + THRESHOLD), key)
+
+    def _run(self, name, model, func, prepare=None):
+        for size in SIZES:
+            for depth in DEPTHS:
+                self._fill(model, size, depth)
+                args = prepare(size) if prepare is not None else ()
+                self._measure(name, size, depth, lambda: func(*args))
+
+    def test_metadata(self):
+        # Per-call cost of unique key lookups of `delete()` and `save()`, no queries
+        obj = next(_objs(ManyUniqueTogetherRem, 1))
+        options = ManyUniqueTogetherRem._meta.soft_remover
+        self.assertEqual(_rebuilt_filters(obj)[0], options.filters(obj))
+
+        rebuilt = timeit.timeit(lambda: _rebuilt_filters(obj), number=CALLS)
+        precomputed = timeit.timeit(lambda: (options.filters(obj), options.filter(obj)), number=CALLS)
+        for name, elapsed in (('metadata_rebuilt', rebuilt), ('metadata', precomputed)):
+            self.results[f'{name}:{CALLS}'] = {'queries': 0, 'seconds': round(elapsed, 4)}
+            print(f'\n{name}:{CALLS}: {elapsed * 1e6 / CALLS:.2f}us per call', end='')
+        self.assertLess(precomputed, rebuilt)
+
+    def test_delete(self):
+        def delete(objs):
+            for obj in objs:
+                obj.delete()
+
+        self._run(
+            'delete', ManyUniqueTogetherRem, delete, lambda size: (list(ManyUniqueTogetherRem.objects.all()[:SAMPLE]),)
+        )
+
+    def test_queryset_delete(self):
+        self._run('queryset_delete', ManyUniqueTogetherRem, lambda: ManyUniqueTogetherRem.objects.all().delete())
+
+    def test_queryset_delete_one(self):
+        # A single row among the removal histories of other keys, with one unique key by the window function
+        self._run(
+            'queryset_delete_one',
+            UniqueTogetherRem,
+            lambda: UniqueTogetherRem.objects.filter(category='TestCategory', name='TestName0').delete(),
+        )
+
+    def test_queryset_restore(self):
+        models = (('queryset_remver_restore', ManyUniqueTogetherRem), ('queryset_restore', ManyUniqueTogetherRes2))
+        for name, model in models:
+            def prepare(size):
+                model.objects.all().delete()
+                return ()
+
+            self._run(name, model, lambda: model.objects.removed().restore(), prepare)
+
+    def test_save_restore(self):
+        def prepare(size):
+            ManyUniqueTogetherRes2.objects.filter(name__in=[f'TestName{i}' for i in range(SAMPLE)]).delete()
+            return (list(_objs(ManyUniqueTogetherRes2, SAMPLE)),)
+
+        def save(objs):
+            for obj in objs:
+                obj.save()
+
+        self._run('save_restore', ManyUniqueTogetherRes2, save, prepare)
+
+    def test_bulk_create_or_restore(self):
+        def prepare(size):
+            ManyUniqueTogetherRes2.objects.all().delete()
+            return (list(_objs(ManyUniqueTogetherRes2, size * 2)),)
+
+        self._run(
+            'bulk_create_or_restore',
+            ManyUniqueTogetherRes2,
+            lambda objs: ManyUniqueTogetherRes2.objects.bulk_create_or_restore(objs),
+            prepare,
+        )
@@ -0,0 +1,59 @@
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+
+from .models import SimpleRes, CachedRes
+
+
+class TestSoftRemoverCached(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_get(self):
+        obj = CachedRes.objects.create(category='TestCategory', name='TestName')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(CachedRes.objects.cached.get(pk=obj.pk), obj)
+            self.assertEqual(CachedRes.objects.cached.get(pk=obj.pk), obj)
+        with self.assertNumQueries(1):
+            self.assertEqual(CachedRes.objects.cached.get_by_unique(category='TestCategory', name='TestName'), obj)
+            self.assertEqual(CachedRes.objects.cached.get(name='TestName', category='TestCategory'), obj)
+
+        obj.delete()
+        with self.assertNumQueries(2):
+            for _ in range(2):
+                with self.assertRaises(CachedRes.DoesNotExist):
+                    CachedRes.objects.cached.get(pk=obj.pk)
+                with self.assertRaises(CachedRes.DoesNotExist):
+                    CachedRes.objects.cached.get_by_unique(category='TestCategory', name='TestName')
+
+        CachedRes.objects.create(category='TestCategory', name='TestName')
+        self.assertEqual(CachedRes.objects.cached.get(pk=obj.pk), obj)
+        self.assertEqual(CachedRes.objects.cached.get_by_unique(category='TestCategory', name='TestName'), obj)
+
+        with self.assertRaises(ValueError):
+            CachedRes.objects.cached.get(name='TestName')
+        with self.assertRaises(ImproperlyConfigured):
+            SimpleRes.objects.cached
+
+    def test_invalidation(self):
+        obj = CachedRes.objects.create(category='TestCategory', name='TestName')
+        CachedRes.objects.cached.get(pk=obj.pk)
+        CachedRes.objects.cached.get_by_unique(category='TestCategory', name='TestName')
+
+        obj.name = 'TestName2'
+        obj.save()
+        self.assertEqual(CachedRes.objects.cached.get(pk=obj.pk).name, 'TestName2')
+        with self.assertRaises(CachedRes.DoesNotExist):
+            CachedRes.objects.cached.get_by_unique(category='TestCategory', name='TestName')
+
+        CachedRes.objects.all().delete()
+        with self.assertRaises(CachedRes.DoesNotExist):
+            CachedRes.objects.cached.get(pk=obj.pk)
+
+        CachedRes.objects.removed().restore()
+        self.assertEqual(CachedRes.objects.cached.get_by_unique(category='TestCategory', name='TestName2'), obj)
+
+        CachedRes.objects.get_all().delete_fully()
+        with self.assertRaises(CachedRes.DoesNotExist):
+            CachedRes.objects.cached.get(pk=obj.pk)
@@ -0,0 +1,108 @@
+from django.test import TestCase
+from django.db.models.deletion import ProtectedError
+
+from soft_remover.signals import post_restore
+
+from .models import CascadeRes, CascadeChildRem, CascadeGrandChildRes, CascadeProtectedRes
+
+
+class TestSoftCascade(TestCase):
+    def _create(self, name):
+        parent = CascadeRes.objects.create(name=name)
+        for i in range(3):
+            child = CascadeChildRem.objects.create(parent=parent, name=f'TestName{i}')
+            CascadeGrandChildRes.objects.create(parent=child)
+        return parent
+
+    def test_delete(self):
+        parent = self._create('TestName1')
+        self._create('TestName2')
+        CascadeChildRem.objects.filter(name='TestName0').first().delete()
+
+        parent.delete()
+
+        self.assertTrue(CascadeRes.objects.all().count() == 1)
+        self.assertTrue(CascadeChildRem.objects.all().count() == 3)
+        self.assertTrue(CascadeChildRem.objects.removed().filter(removed_by_cascade=True).count() == 2)
+        self.assertTrue(CascadeGrandChildRes.objects.all().count() == 4)
+        self.assertTrue(CascadeGrandChildRes.objects.removed().filter(removed_by_cascade=True).count() == 2)
+
+        CascadeRes.objects.removed().restore()
+
+        self.assertTrue(CascadeRes.objects.all().count() == 2)
+        self.assertTrue(CascadeChildRem.objects.all().count() == 5)
+        self.assertTrue(CascadeChildRem.objects.removed().count() == 1)
+        self.assertTrue(CascadeGrandChildRes.objects.all().count() == 6)
+        self.assertTrue(CascadeChildRem.all_objects.filter(removed_by_cascade=True).count() == 0)
+
+    def test_direct_delete_after_restore(self):
+        parent = self._create('TestName1')
+        parent.delete()
+        child = CascadeChildRem.objects.removed().get(name='TestName1')
+        grandchild = CascadeGrandChildRes.objects.removed().get(parent=child)
+
+        # Restored and removed again directly, so they aren't restored by the cascade
+        CascadeChildRem.objects.removed().filter(pk=child.pk).restore()
+        grandchild.restore()
+        self.assertTrue(CascadeChildRem.all_objects.get(pk=child.pk).removed_by_cascade is False)
+        self.assertTrue(grandchild.removed_by_cascade is False)
+        CascadeChildRem.objects.filter(pk=child.pk).delete()
+        grandchild.delete()
+
+        CascadeRes.objects.removed().get(pk=parent.pk).restore()
+        self.assertTrue(CascadeChildRem.objects.all().count() == 2)
+        self.assertTrue(CascadeChildRem.objects.removed().get().pk == child.pk)
+        self.assertTrue(CascadeGrandChildRes.objects.removed().get().pk == grandchild.pk)
+
+    def test_restore_taken_key(self):
+        parent = self._create('TestName1')
+        parent.delete()
+        child = CascadeChildRem.objects.removed().get(name='TestName0')
+        # The key of the removed child is taken while the parent is removed
+        CascadeChildRem.objects.create(parent=parent, name='TestName0')
+
+        received = []
+
+        def receiver(sender, **kwargs):
+            received.append(kwargs['skipped'])
+
+        post_restore.connect(receiver, sender=CascadeRes)
+        self.addCleanup(post_restore.disconnect, receiver, sender=CascadeRes)
+
+        self.assertEqual(CascadeRes.objects.removed().restore(), (5, []))
+        self.assertEqual(received, [{'tests.CascadeChildRem': [child.pk]}])
+        self.assertTrue(CascadeChildRem.objects.removed().get().pk == child.pk)
+        self.assertTrue(CascadeChildRem.objects.all().count() == 3)
+        # Rows related to the skipped row stay removed too
+        self.assertTrue(CascadeGrandChildRes.objects.removed().get().parent_id == child.pk)
+        self.assertTrue(CascadeGrandChildRes.objects.all().count() == 2)
+
+    def test_queryset_delete(self):
+        self._create('TestName1')
+        self._create('TestName2')
+
+        # Collecting: parents, related rows per relation; removal: one update per model
+        with self.assertNumQueries(9):
+            result = CascadeRes.objects.all().delete()
+
+        self.assertEqual(
+            result,
+            (14, {'tests.CascadeRes': 2, 'tests.CascadeChildRem': 6, 'tests.CascadeGrandChildRes': 6}),
+        )
+        self.assertTrue(CascadeRes.objects.removed().first().children.filter(is_removed=False).count() == 0)
+
+        parent = CascadeRes.objects.removed().first()
+        parent.restore()
+        self.assertTrue(parent.children.filter(is_removed=False).count() == 3)
+
+    def test_protect(self):
+        parent = self._create('TestName1')
+        protected = CascadeProtectedRes.objects.create(parent=parent)
+
+        with self.assertRaises(ProtectedError):
+            parent.delete()
+        self.assertTrue(CascadeChildRem.objects.all().count() == 3)
+
+        protected.delete()
+        parent.delete()
+        self.assertTrue(CascadeChildRem.objects.all().count() == 0)
@@ -0,0 +1,90 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from .models import UniqueTogetherRem, RestoreTogetherRes, CascadeRes, CascadeChildRem
+
+
+class WriteReplicaRouter:
+    def db_for_write(self, model, **hints):
+        return 'replica'
+
+
+class TestSoftRemoveCommands(TestCase):
+    databases = {'default', 'replica'}
+
+    def _file(self, content):
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_softremove(self):
+        objs = [UniqueTogetherRem(category='TestCategory', name=f'TestName{i}', value=0) for i in range(5)]
+        UniqueTogetherRem.objects.bulk_create(objs)
+        pks = list(UniqueTogetherRem.objects.order_by('pk').values_list('pk', flat=True))
+        path = self._file('id,name\n' + ''.join(f'{pk},TestName\n' for pk in pks[:4]) + '\n')
+
+        out = StringIO()
+        call_command('softremove', 'tests.UniqueTogetherRem', path, dry_run=True, stdout=out)
+        self.assertIn('4 rows of tests.UniqueTogetherRem would be removed', out.getvalue())
+        self.assertTrue(UniqueTogetherRem.objects.all().count() == 5)
+
+        out = StringIO()
+        call_command('softremove', 'tests.UniqueTogetherRem', path, batch_size=3, verbosity=2, stdout=out)
+        self.assertIn('3 rows removed, last pk', out.getvalue())
+        self.assertIn('4 rows of tests.UniqueTogetherRem removed', out.getvalue())
+        self.assertEqual(list(UniqueTogetherRem.objects.values_list('pk', flat=True)), pks[4:])
+
+        with self.assertRaises(CommandError):
+            call_command('softremove', 'tests.UniqueTogetherRem', self._file('1\nx\n'))
+        with self.assertRaises(CommandError):
+            call_command('softremove', 'tests.UniqueTogetherRem', path + '.missing')
+
+    def test_cascade(self):
+        parent = CascadeRes.objects.create(name='TestName')
+        CascadeChildRem.objects.bulk_create([CascadeChildRem(parent=parent, name=f'TestName{i}') for i in range(2)])
+        path = self._file(f'{parent.pk}\n')
+
+        out = StringIO()
+        call_command('softremove', 'tests.CascadeRes', path, stdout=out)
+        self.assertIn('1 rows of tests.CascadeRes removed', out.getvalue())
+        self.assertIn('2 rows of tests.CascadeChildRem removed by cascade', out.getvalue())
+        self.assertTrue(CascadeChildRem.objects.all().count() == 0)
+
+        out = StringIO()
+        call_command('softrestore', 'tests.CascadeRes', path, stdout=out)
+        self.assertIn('1 rows of tests.CascadeRes restored', out.getvalue())
+        self.assertIn('2 rows of tests.CascadeChildRem restored by cascade', out.getvalue())
+        self.assertTrue(CascadeChildRem.objects.all().count() == 2)
+
+    def test_softrestore(self):
+        pks = [RestoreTogetherRes.objects.create(name=f'TestName{i}').pk for i in range(3)]
+        RestoreTogetherRes.objects.all().delete()
+        RestoreTogetherRes.objects.bulk_create([RestoreTogetherRes(name='TestName0')])
+
+        out, err = StringIO(), StringIO()
+        with mock.patch('sys.stdin', StringIO('\n'.join(map(str, pks)))):
+            call_command('softrestore', 'tests.RestoreTogetherRes', stdout=out, stderr=err)
+        self.assertIn('2 rows of tests.RestoreTogetherRes restored', out.getvalue())
+        self.assertIn(f'1 rows skipped because of unique keys: {pks[0]}', err.getvalue())
+        self.assertTrue(RestoreTogetherRes.objects.all().count() == 3)
+
+    @override_settings(DATABASE_ROUTERS=[WriteReplicaRouter()])
+    def test_router(self):
+        pks = [RestoreTogetherRes.objects.create(name=f'TestName{i}').pk for i in range(2)]
+        path = self._file('\n'.join(map(str, pks)))
+
+        call_command('softremove', 'tests.RestoreTogetherRes', path, stdout=StringIO())
+        self.assertTrue(RestoreTogetherRes.objects.db_manager('replica').removed().count() == 2)
+        call_command('softrestore', 'tests.RestoreTogetherRes', path, stdout=StringIO())
+        self.assertTrue(RestoreTogetherRes.objects.db_manager('replica').all().count() == 2)
+        RestoreTogetherRes.objects.all().delete()
+        call_command('softpurge', 'tests.RestoreTogetherRes', stdout=StringIO())
+        self.assertTrue(RestoreTogetherRes.all_objects.using('replica').count() == 0)
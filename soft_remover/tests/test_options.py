@@ -0,0 +1,61 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models
+from django.test import SimpleTestCase
+from django.test.utils import isolate_apps
+
+from soft_remover.models import SoftRemovableModel, SoftRestorableModel
+
+from .models import ManyUniqueTogetherRem2, ManyRestoreTogetherRes, CascadeChildRem, RemovedAtRes, PartialUpsertRes
+
+
+class TestSoftRemoverOptions(SimpleTestCase):
+    def test_options(self):
+        options = ManyUniqueTogetherRem2._meta.soft_remover
+        self.assertEqual(options.unique_fields, (('category', 'name'), ('category', 'tag')))
+        self.assertEqual(options.key_fields, ('category', 'name', 'tag'))
+        self.assertEqual(options.update_fields, ('is_removed', 'remver'))
+        self.assertIsNone(options.conflict_fields)
+        self.assertIs(ManyUniqueTogetherRem2()._soft_remover_unique_fields, options.unique_fields)
+
+        options = ManyRestoreTogetherRes._meta.soft_remover
+        self.assertEqual(options.restore_together, (('category', 'name'),))
+        self.assertEqual(options.update_fields, ('is_removed',))
+
+        options = CascadeChildRem._meta.soft_remover
+        self.assertEqual(options.unique_attnames, (('parent_id', 'name'),))
+        self.assertTrue(options.has_cascade_field)
+
+        options = RemovedAtRes._meta.soft_remover
+        self.assertEqual(options.update_fields, ('is_removed', 'removed_at'))
+        self.assertEqual(options.conflict_fields, ('name',))
+
+        options = PartialUpsertRes._meta.soft_remover
+        self.assertEqual(options.unique_fields, (('name',),))
+        self.assertIsNone(options.conflict_fields)
+
+    @isolate_apps('soft_remover.tests')
+    def test_invalid_attribute(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "got invalid attribute 'restore_togther'"):
+            class InvalidAttributeRes(SoftRestorableModel):
+                name = models.CharField(max_length=32)
+
+                class MetaSoftRemover:
+                    restore_togther = ('name',)
+
+    @isolate_apps('soft_remover.tests')
+    def test_invalid_field(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "the nonexistent field 'title'"):
+            class InvalidFieldRem(SoftRemovableModel):
+                name = models.CharField(max_length=32)
+
+                class MetaSoftRemover:
+                    restore_together = ('title',)
+
+    @isolate_apps('soft_remover.tests')
+    def test_invalid_restore_lock(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "'restore_lock' must be one of"):
+            class InvalidRestoreLockRes(SoftRestorableModel):
+                name = models.CharField(max_length=32)
+
+                class MetaSoftRemover:
+                    restore_lock = 'share'
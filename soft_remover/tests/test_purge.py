@@ -0,0 +1,63 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from .models import SimpleRem, SimpleRes, CascadeRes, CascadeChildRem, ArchiveRes, ArchiveProfileRes
+
+
+class TestPurge(TestCase):
+    def test_purge(self):
+        SimpleRem.objects.bulk_create([SimpleRem(name=f'TestName{i}') for i in range(25)])
+        SimpleRem.objects.filter(pk__lte=20).delete()
+
+        chunks = []
+        count = SimpleRem.objects.removed().purge(batch_size=8, progress=lambda *args: chunks.append(args))
+
+        self.assertEqual(count, 20)
+        self.assertEqual([count for count, _ in chunks], [8, 16, 20])
+        self.assertTrue(SimpleRem.objects.all().count() == 5)
+        self.assertTrue(SimpleRem.objects.removed().count() == 0)
+
+    def test_purge_related(self):
+        parent = CascadeRes.objects.create(name='TestName')
+        CascadeChildRem.objects.create(parent=parent, name='TestName')
+        parent.delete()
+
+        self.assertEqual(CascadeRes.objects.removed().purge(), 1)
+        self.assertTrue(CascadeChildRem.all_objects.count() == 0)
+
+    def test_live_references(self):
+        owners = [ArchiveRes.objects.create(name=f'TestName{i}') for i in range(3)]
+        ArchiveProfileRes.objects.create(owner=owners[0])
+        ArchiveRes.objects.all().delete()
+
+        chunks = []
+        count = ArchiveRes.objects.removed().purge(batch_size=1, progress=lambda *args: chunks.append(args))
+        self.assertEqual(count, 2)
+        self.assertEqual(chunks, [(0, owners[0].pk), (1, owners[1].pk), (2, owners[2].pk)])
+        self.assertEqual(list(ArchiveRes.objects.removed().values_list('pk', flat=True)), [owners[0].pk])
+        self.assertTrue(ArchiveProfileRes.objects.filter(owner=owners[0]).exists())
+
+        call_command('softpurge', 'tests.ArchiveRes', stdout=StringIO())
+        self.assertTrue(ArchiveRes.objects.removed().count() == 1)
+        self.assertTrue(ArchiveProfileRes.objects.filter(owner=owners[0]).exists())
+
+    def test_time_budget(self):
+        SimpleRes.objects.bulk_create([SimpleRes(name=f'TestName{i}', is_removed=True) for i in range(10)])
+
+        self.assertEqual(SimpleRes.objects.removed().purge(batch_size=3, time_budget=1e-9), 3)
+        self.assertTrue(SimpleRes.objects.removed().count() == 7)
+
+    def test_command(self):
+        SimpleRes.objects.bulk_create([SimpleRes(name=f'TestName{i}', is_removed=i % 2) for i in range(10)])
+
+        out = StringIO()
+        call_command('softpurge', 'tests.SimpleRes', batch_size=2, stdout=out)
+
+        self.assertIn('5 rows of tests.SimpleRes deleted', out.getvalue())
+        self.assertTrue(SimpleRes.all_objects.count() == 5)
+
+        with self.assertRaises(CommandError):
+            call_command('softpurge', 'auth.User')
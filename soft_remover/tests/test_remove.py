@@ -1,13 +1,21 @@
-from django.test import TestCase
-from django.db.utils import IntegrityError
-from django.db import transaction
+import threading
+import time
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase
+from django.db.utils import IntegrityError, OperationalError
+from django.db import connection, transaction
+from django.db.models import Q
+
+from soft_remover.managers import SoftRemovableQuerySet
 
 from .models import (
     SimpleRem,
     SimpleUniqueRem, SimpleUniqueRem2,
-    UniqueTogetherRem, UniqueTogetherRem2,
+    UniqueTogetherRem, UniqueTogetherRem2, NullUniqueTogetherRem,
     ManyUniqueRem, ManyUniqueRem2,
     ManyUniqueTogetherRem, ManyUniqueTogetherRem2,
+    LiveIndexesRem, LiveIndexesProxyRem,
 )
 
 
@@ -263,3 +271,233 @@ class TestSoftRemove(TestCase):
 
     def test_many_unique_together2(self):
         self._many_unique_together(ManyUniqueTogetherRem2)
+
+
+class TestSoftRemoveBulk(TestCase):
+    def test_remver(self):
+        for i in range(3):
+            ManyUniqueTogetherRem.objects.create(category='TestCategory', name='TestName1', tag='tag1', value=i)
+            ManyUniqueTogetherRem.objects.create(category='TestCategory', name='TestName2', tag='tag2', value=i)
+            ManyUniqueTogetherRem.objects.create(category='TestCategory', name=f'OtherName{i}', tag='tag', value=i)
+            result = ManyUniqueTogetherRem.objects.all().delete()
+            self.assertEqual(result, (3, {'tests.ManyUniqueTogetherRem': 3}))
+
+        removed = ManyUniqueTogetherRem.objects.removed()
+        self.assertEqual(
+            sorted(removed.filter(name='TestName1', tag='tag1').values_list('remver', flat=True)), [1, 2, 3]
+        )
+        self.assertEqual(
+            sorted(removed.filter(name='TestName2', tag='tag2').values_list('remver', flat=True)), [1, 2, 3]
+        )
+        self.assertEqual(ManyUniqueTogetherRem.objects.all().delete(), (0, {}))
+
+    def test_remver_no_unique(self):
+        SimpleRem.objects.create(name='TestName')
+        SimpleRem.objects.first().delete()
+        SimpleRem.objects.bulk_create([SimpleRem(name='TestName') for _ in range(3)])
+        SimpleRem.objects.all().delete()
+
+        self.assertEqual(sorted(SimpleRem.objects.removed().values_list('remver', flat=True)), [1, 2, 3, 4])
+
+    def test_sliced(self):
+        for i in range(3):
+            UniqueTogetherRem.objects.create(category='TestCategory', name=f'TestName{i}', value=i)
+
+        result = UniqueTogetherRem.objects.order_by('-pk')[:2].delete()
+        self.assertEqual(result, (2, {'tests.UniqueTogetherRem': 2}))
+        self.assertEqual(list(UniqueTogetherRem.objects.values_list('name', flat=True)), ['TestName0'])
+        self.assertEqual(set(UniqueTogetherRem.objects.removed().values_list('remver', flat=True)), {1})
+
+    def test_num_queries(self):
+        for size in (10, 100):
+            UniqueTogetherRem.objects.bulk_create(
+                [UniqueTogetherRem(category=f'TestCategory{size}', name=f'TestName{i}', value=0) for i in range(size)]
+            )
+            # Savepoint, update numbering the versions, release
+            with self.assertNumQueries(3):
+                UniqueTogetherRem.objects.all().delete()
+
+        self.assertEqual(UniqueTogetherRem.objects.removed().filter(remver=1).count(), 110)
+
+    @mock.patch.object(SoftRemovableQuerySet, 'soft_remover_window_update', False)
+    def test_num_queries_fallback(self):
+        for size in (10, 100):
+            UniqueTogetherRem.objects.bulk_create(
+                [UniqueTogetherRem(category=f'TestCategory{size}', name=f'TestName{i}', value=0) for i in range(size)]
+            )
+            # Savepoint, select targets, max removed versions per unique key, one update per remver value
+            with self.assertNumQueries(5):
+                UniqueTogetherRem.objects.all().delete()
+
+        self.assertEqual(UniqueTogetherRem.objects.removed().filter(remver=1).count(), 110)
+
+    def _remvers(self):
+        for _ in range(2):
+            UniqueTogetherRem.objects.create(category='TestCategory', name='TestName1', value=0).delete()
+            SimpleRem.objects.create(name='TestName').delete()
+        UniqueTogetherRem.objects.bulk_create(
+            [UniqueTogetherRem(category='TestCategory', name=name, value=0) for name in ('TestName1', 'TestName2')]
+        )
+        SimpleRem.objects.bulk_create([SimpleRem(name='TestName') for _ in range(3)])
+        UniqueTogetherRem.objects.all().delete()
+        SimpleRem.objects.all().delete()
+
+        remvers = [
+            list(model.objects.removed().order_by('pk').values_list('remver', flat=True))
+            for model in (UniqueTogetherRem, SimpleRem)
+        ]
+        UniqueTogetherRem.all_objects.all().delete()
+        SimpleRem.all_objects.all().delete()
+        return remvers
+
+    def test_null_keys(self):
+        model = NullUniqueTogetherRem
+        for _ in range(2):
+            model.objects.bulk_create([model(category='TestCategory', name=name) for name in (None, None, 'TestName')])
+            model.objects.all().delete()
+
+        # Rows with NULL keys never conflict, their versions aren't continued
+        remvers = model.objects.removed().order_by('pk').values_list('name', 'remver')
+        self.assertEqual(list(remvers), [(None, 1), (None, 2), ('TestName', 1), (None, 1), (None, 2), ('TestName', 2)])
+
+    def test_window_fallback(self):
+        # Versions follow the removed versions of every key in the order of primary keys
+        expected = [[1, 2, 3, 1], [1, 2, 3, 4, 5]]
+        self.assertEqual(self._remvers(), expected)
+        with mock.patch.object(SoftRemovableQuerySet, 'soft_remover_window_update', False):
+            self.assertEqual(self._remvers(), expected)
+
+
+class TestSoftRemoveRestore(TestCase):
+    def test_restore(self):
+        model = UniqueTogetherRem
+        for i in range(3):
+            model.objects.create(category='TestCategory', name='TestName1', value=i)
+            model.objects.create(category='TestCategory', name='TestName2', value=i)
+            model.objects.all().delete()
+        model.objects.create(category='TestCategory', name='TestName2', value=3)
+
+        # Removed rows, live keys, restore
+        with self.assertNumQueries(3):
+            count, skipped = model.objects.removed().restore()
+
+        self.assertTrue(count == 1)
+        self.assertTrue(len(skipped) == 5)
+        restored = model.objects.get(name='TestName1')
+        self.assertEqual((restored.remver, restored.value), (0, 2))
+        self.assertEqual(sorted(model.objects.removed().values_list('remver', flat=True)), [1, 1, 2, 2, 3])
+
+        restored.delete()
+        self.assertEqual(model.objects.removed().get(pk=restored.pk).remver, 3)
+
+    def test_restore_no_unique(self):
+        SimpleRem.objects.bulk_create([SimpleRem(name='TestName') for _ in range(3)])
+        SimpleRem.objects.all().delete()
+
+        self.assertEqual(SimpleRem.objects.removed().restore(), (3, []))
+        self.assertEqual(set(SimpleRem.objects.values_list('remver', flat=True)), {0})
+
+
+class TestSoftRemovePks(TestCase):
+    def test_pks(self):
+        model = UniqueTogetherRem
+        pks = [model.objects.create(category='TestCategory', name=f'TestName{i}', value=0).pk for i in range(5)]
+        model.objects.filter(pk=pks[0]).delete()
+        model.objects.create(category='TestCategory', name='TestName0', value=0)
+
+        # Savepoint, per chunk: savepoint, update, release; release
+        with self.assertNumQueries(8):
+            result = model.objects.soft_delete_pks(pks + [pks[1]], batch_size=3)
+        self.assertEqual(result, (4, {'tests.UniqueTogetherRem': 4}))
+        self.assertTrue(model.objects.all().count() == 1)
+
+        self.assertEqual(model.objects.restore_pks(pks, batch_size=2), (4, [pks[0]]))
+        self.assertTrue(model.objects.all().count() == 5)
+        self.assertTrue(model.objects.removed().get().pk == pks[0])
+
+
+class TestSoftRemoveRetries(TestCase):
+    def test_retry(self):
+        UniqueTogetherRem.objects.create(category='TestCategory', name='TestName', value=0).delete()
+        obj = UniqueTogetherRem.objects.create(category='TestCategory', name='TestName', value=0)
+        next_remver = UniqueTogetherRem._soft_remover_next_remver
+        remvers = []
+
+        def taken_once(obj, using):
+            # A concurrent removal took the version between the lookup and the update
+            remvers.append(1 if not remvers else next_remver(obj, using))
+            return remvers[-1]
+
+        with mock.patch.object(UniqueTogetherRem, '_soft_remover_next_remver', taken_once):
+            obj.delete()
+        self.assertEqual(remvers, [1, 2])
+        self.assertTrue(obj.is_removed and obj.remver == 2)
+        self.assertEqual(sorted(UniqueTogetherRem.objects.removed().values_list('remver', flat=True)), [1, 2])
+
+    def test_retries_exhausted(self):
+        UniqueTogetherRem.objects.create(category='TestCategory', name='TestName', value=0).delete()
+        obj = UniqueTogetherRem.objects.create(category='TestCategory', name='TestName', value=0)
+
+        taken = mock.Mock(return_value=1)
+        with mock.patch.object(UniqueTogetherRem, '_soft_remover_next_remver', taken):
+            with self.assertRaises(IntegrityError):
+                obj.delete()
+        self.assertTrue(taken.call_count == UniqueTogetherRem._meta.soft_remover.remver_retries == 3)
+        self.assertTrue(not obj.is_removed and obj.remver == 0)
+        self.assertTrue(UniqueTogetherRem.objects.filter(pk=obj.pk).exists())
+
+
+class TestSoftRemoveConcurrent(TransactionTestCase):
+    def test_delete_same_key(self):
+        errors = []
+
+        def worker():
+            try:
+                for _ in range(10):
+                    try:
+                        with transaction.atomic():
+                            obj = UniqueTogetherRem.objects.create(category='TestCategory', name='TestName', value=0)
+                    except (IntegrityError, OperationalError):
+                        continue
+                    for _ in range(1000):
+                        try:
+                            obj.delete()
+                            break
+                        except OperationalError:  # SQLite shared cache: "database table is locked"
+                            time.sleep(0.001)
+                    else:
+                        errors.append(f'{obj.pk} is not removed')
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        remvers = list(UniqueTogetherRem.objects.removed().values_list('remver', flat=True))
+        self.assertTrue(remvers)
+        self.assertEqual(sorted(remvers), list(range(1, len(remvers) + 1)))
+
+
+class TestSoftRemoveLiveIndexes(TestCase):
+    def test_indexes(self):
+        indexes = {tuple(index.fields): index for index in LiveIndexesRem._meta.indexes}
+        self.assertEqual(set(indexes), {('id',), ('category', 'name')})
+        for index in indexes.values():
+            self.assertEqual(index.condition, Q(is_removed=False))
+            self.assertTrue(len(index.name) <= 30)
+        self.assertEqual(SimpleRem._meta.indexes, [])
+        self.assertEqual(LiveIndexesProxyRem._meta.indexes, [])
+        self.assertEqual(LiveIndexesProxyRem.check(), [])
+
+        obj = LiveIndexesRem.objects.create(category='TestCategory', name='TestName')
+        obj.delete()
+        LiveIndexesRem.objects.create(category='TestCategory', name='TestName')
+
+        self.assertTrue(LiveIndexesRem.objects.all().count() == 1)
+        self.assertTrue(LiveIndexesRem.objects.removed().count() == 1)
@@ -0,0 +1,82 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from .models import SimpleRes, RemovedAtRem, RemovedAtRes
+
+
+class TestRemovedAt(TestCase):
+    def test_remove(self):
+        started = timezone.now()
+        obj = RemovedAtRem.objects.create(name='TestName1')
+        self.assertIsNone(obj.removed_at)
+        obj.delete()
+        self.assertTrue(obj.removed_at >= started)
+
+        RemovedAtRem.objects.create(name='TestName1')
+        RemovedAtRem.objects.create(name='TestName2')
+        RemovedAtRem.objects.all().delete()
+
+        self.assertTrue(RemovedAtRem.objects.removed_since(started).count() == 3)
+        self.assertTrue(RemovedAtRem.objects.removed_before(started).count() == 0)
+        self.assertTrue(RemovedAtRem.objects.removed_before(timezone.now() + timedelta(seconds=1)).count() == 3)
+
+    def test_restore(self):
+        started = timezone.now()
+        obj = RemovedAtRes.objects.create(name='TestName1')
+        obj.delete()
+        self.assertTrue(RemovedAtRes.objects.removed_since(started).count() == 1)
+
+        obj.restore()
+        self.assertIsNone(obj.removed_at)
+        self.assertIsNone(RemovedAtRes.objects.get(pk=obj.pk).removed_at)
+
+        RemovedAtRes.objects.all().delete()
+        RemovedAtRes.objects.removed().restore()
+        self.assertFalse(RemovedAtRes.all_objects.filter(removed_at__isnull=False).exists())
+
+        RemovedAtRes.objects.all().delete()
+        RemovedAtRes.objects.create(name='TestName1')
+        self.assertFalse(RemovedAtRes.all_objects.filter(removed_at__isnull=False).exists())
+
+    def test_purge_older_than(self):
+        RemovedAtRem.objects.create(name='TestName1').delete()
+        RemovedAtRem.objects.create(name='TestName2').delete()
+        RemovedAtRem.all_objects.filter(name='TestName1').update(removed_at=timezone.now() - timedelta(days=91))
+
+        out = StringIO()
+        call_command('softpurge', 'tests.RemovedAtRem', older_than=90, stdout=out)
+
+        self.assertIn('1 rows of tests.RemovedAtRem deleted', out.getvalue())
+        self.assertEqual(list(RemovedAtRem.all_objects.values_list('name', flat=True)), ['TestName2'])
+
+
+class TestRemovedChanges(TestCase):
+    def test_removed_changes(self):
+        objs = [RemovedAtRem.objects.create(name=f'TestName{i}') for i in range(5)]
+        for obj in reversed(objs):
+            obj.delete()
+        RemovedAtRem.objects.create(name='TestName')
+
+        # A query per chunk
+        with self.assertNumQueries(2):
+            changes = list(RemovedAtRem.objects.removed_changes(chunk_size=3))
+        self.assertEqual([change.pk for change in changes], [obj.pk for obj in reversed(objs)])
+        self.assertEqual({(change.remver, change.is_removed) for change in changes}, {(1, True)})
+        self.assertEqual(changes[-1].cursor, (changes[-1].removed_at, changes[-1].pk))
+
+        changes = list(RemovedAtRem.objects.removed_changes(since=changes[1].cursor, chunk_size=2))
+        self.assertEqual([change.pk for change in changes], [obj.pk for obj in reversed(objs[:3])])
+        RemovedAtRem.objects.get(name='TestName').delete()
+        changes = list(RemovedAtRem.objects.removed_changes(since=changes[-1].cursor))
+        self.assertEqual([change.pk for change in changes], [RemovedAtRem.objects.removed().order_by('-pk')[0].pk])
+
+    def test_no_removed_at(self):
+        SimpleRes.objects.create(name='TestName').delete()
+
+        with self.assertRaises(ImproperlyConfigured):
+            SimpleRes.objects.removed_changes()
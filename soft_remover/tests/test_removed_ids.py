@@ -0,0 +1,90 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, skipUnlessDBFeature
+from django.utils import timezone
+
+from .models import SimpleRes, RemovedAtRes
+
+
+class TestSoftRemoverRemovedIds(TestCase):
+    def setUp(self):
+        for model in (SimpleRes, RemovedAtRes):
+            model.objects.removed_ids().invalidate()
+
+    def test_is_removed_many(self):
+        objs = [SimpleRes.objects.create(name=f'TestName{i}') for i in range(3)]
+        objs[0].delete()
+
+        with self.assertNumQueries(1):
+            result = SimpleRes.objects.is_removed_many([obj.pk for obj in objs] + [0])
+        self.assertEqual(result, {objs[0].pk: True, objs[1].pk: False, objs[2].pk: False, 0: False})
+
+        objs[1].delete()
+        objs[0].restore()
+        with self.assertNumQueries(0):
+            result = SimpleRes.objects.is_removed_many([objs[0].pk, str(objs[1].pk)])
+        self.assertEqual(result, {objs[0].pk: False, str(objs[1].pk): True})
+
+        SimpleRes.objects.all().delete()
+        with self.assertNumQueries(1):
+            self.assertTrue(all(SimpleRes.objects.is_removed_many([obj.pk for obj in objs]).values()))
+
+    def test_refresh(self):
+        objs = [RemovedAtRes.objects.create(name=f'TestName{i}') for i in range(3)]
+        objs[0].delete()
+        RemovedAtRes.objects.is_removed_many([])
+
+        # Removal by another process
+        RemovedAtRes.all_objects.filter(pk=objs[1].pk).update(is_removed=True, removed_at=timezone.now())
+        self.assertFalse(RemovedAtRes.objects.is_removed_many([objs[1].pk])[objs[1].pk])
+
+        removed_ids = RemovedAtRes.objects.removed_ids()
+        with mock.patch.object(removed_ids, 'refreshed', removed_ids.refreshed - timedelta(minutes=5).total_seconds()):
+            with self.assertNumQueries(1):
+                result = RemovedAtRes.objects.is_removed_many([obj.pk for obj in objs])
+        self.assertEqual(result, {objs[0].pk: True, objs[1].pk: True, objs[2].pk: False})
+
+    def test_reload(self):
+        obj = RemovedAtRes.objects.create(name='TestName')
+        obj.delete()
+        removed_ids = RemovedAtRes.objects.removed_ids()
+        self.assertTrue(RemovedAtRes.objects.is_removed_many([obj.pk])[obj.pk])
+
+        # Restore by another process, refreshes see new removals only
+        RemovedAtRes.all_objects.filter(pk=obj.pk).update(is_removed=False, removed_at=None)
+        removed_ids.refreshed -= removed_ids.ttl
+        self.assertTrue(RemovedAtRes.objects.is_removed_many([obj.pk])[obj.pk])
+
+        removed_ids.refreshed -= removed_ids.ttl
+        with mock.patch.object(removed_ids, 'refreshes', removed_ids.reload_refreshes - 1):
+            self.assertFalse(RemovedAtRes.objects.is_removed_many([obj.pk])[obj.pk])
+            self.assertTrue(removed_ids.refreshes == 0)
+
+    @skipUnlessDBFeature('can_return_columns_from_insert')
+    def test_upsert(self):
+        obj = RemovedAtRes.objects.create(name='TestName')
+        obj.delete()
+        self.assertTrue(RemovedAtRes.objects.is_removed_many([obj.pk])[obj.pk])
+
+        self.assertTrue(RemovedAtRes.objects.create(name='TestName').pk == obj.pk)
+        with self.assertNumQueries(0):
+            self.assertFalse(RemovedAtRes.objects.is_removed_many([obj.pk])[obj.pk])
+
+    def test_hard_deletion(self):
+        objs = [SimpleRes.objects.create(name=f'TestName{i}') for i in range(4)]
+        pks = [obj.pk for obj in objs]
+        SimpleRes.objects.all().delete()
+        self.assertTrue(all(SimpleRes.objects.is_removed_many(pks).values()))
+
+        # Missing rows aren't removed
+        SimpleRes.objects.removed().filter(pk=pks[0]).purge()
+        objs[1].delete_fully()
+        with self.assertNumQueries(0):
+            result = SimpleRes.objects.is_removed_many(pks)
+        self.assertEqual(result, {pks[0]: False, pks[1]: False, pks[2]: True, pks[3]: True})
+
+        SimpleRes.objects.removed().filter(pk=pks[2]).delete_fully()
+        with self.assertNumQueries(1):
+            result = SimpleRes.objects.is_removed_many(pks)
+        self.assertEqual(result, {pks[0]: False, pks[1]: False, pks[2]: False, pks[3]: True})
@@ -1,6 +1,13 @@
-from django.test import TestCase
-from django.db.utils import IntegrityError
-from django.db import transaction
+import threading
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.db.utils import IntegrityError, OperationalError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.signals import post_save
+
+from soft_remover import restore_cache
 
 from .models import (
     SimpleRes,
@@ -9,6 +16,7 @@ from .models import (
     ManyUniqueRes, ManyUniqueRes2,
     ManyUniqueTogetherRes, ManyUniqueTogetherRes2,
     RestoreTogetherRes, ManyRestoreTogetherRes,
+    UseSaveRes, UpsertRes, PartialUpsertRes, LiveIndexesRes, RestoreLockRes,
 )
 
 
@@ -367,3 +375,305 @@ class TestSoftRestore(TestCase):
         self.assertTrue(ManyRestoreTogetherRes.objects.all().count() == 0)
         self.assertTrue(ManyRestoreTogetherRes.objects.removed().count() == 0)
         self.assertTrue(ManyRestoreTogetherRes.all_objects.all().count() == 0)
+
+
+class TestSoftRestoreLiveIndexes(TestCase):
+    def test_constraints(self):
+        self.assertEqual(
+            [(constraint.fields, constraint.condition) for constraint in LiveIndexesRes._meta.constraints],
+            [(('category', 'name'), Q(is_removed=False))],
+        )
+
+        obj = LiveIndexesRes.objects.create(category='TestCategory', name='TestName')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            LiveIndexesRes.all_objects.create(category='TestCategory', name='TestName')
+        obj.delete()
+        LiveIndexesRes.all_objects.create(category='TestCategory', name='TestName')
+
+
+class TestSoftRestoreWrites(TestCase):
+    def _saved(self, model):
+        saved = []
+
+        def receiver(sender, update_fields, **kwargs):
+            saved.append(update_fields)
+
+        post_save.connect(receiver, sender=model, weak=False)
+        self.addCleanup(post_save.disconnect, receiver, sender=model)
+        return saved
+
+    def test_update(self):
+        obj = SimpleUniqueRes.objects.create(name='TestName')
+        saved = self._saved(SimpleUniqueRes)
+
+        with self.assertNumQueries(1):
+            obj.delete()
+        self.assertTrue(SimpleUniqueRes.objects.removed().filter(pk=obj.pk).exists())
+
+        with self.assertNumQueries(1):
+            obj.restore()
+        self.assertTrue(SimpleUniqueRes.objects.filter(pk=obj.pk).exists())
+
+        obj.delete()
+        with self.assertNumQueries(4):  # Savepoint, lookup, restore, release savepoint
+            self.assertEqual(SimpleUniqueRes.objects.create(name='TestName').pk, obj.pk)
+
+        self.assertEqual(saved, [])
+
+    def test_use_save(self):
+        obj = UseSaveRes.objects.create(name='TestName')
+        saved = self._saved(UseSaveRes)
+
+        obj.delete()
+        obj.restore()
+
+        self.assertEqual(saved, [frozenset({'is_removed'}), frozenset({'is_removed'})])
+        self.assertTrue(UseSaveRes.objects.filter(pk=obj.pk).exists())
+
+
+class TestSoftRestoreBulkCreate(TestCase):
+    def test_bulk_create_or_restore(self):
+        model = ManyUniqueTogetherRes
+        model.objects.create(category='TestCategory', name='TestName1', tag='tag1', value=0)
+        model.objects.create(category='TestCategory', name='TestName2', tag='tag2', value=0)
+        model.objects.create(category='TestCategory', name='TestName3', tag='tag3', value=0)
+        model.objects.exclude(name='TestName3').delete()
+        removed = {obj.name: obj.pk for obj in model.objects.removed()}
+
+        objs = [
+            model(category='TestCategory', name='TestName1', tag='tag11', value=1),
+            model(category='TestCategory', name='TestName22', tag='tag2', value=1),
+            model(category='TestCategory', name='TestName4', tag='tag4', value=1),
+        ]
+        # Lookup per unique key, restore, insert
+        with self.assertNumQueries(4):
+            self.assertEqual(model.objects.bulk_create_or_restore(objs), objs)
+
+        self.assertEqual(objs[0].pk, removed['TestName1'])
+        self.assertEqual(objs[1].pk, removed['TestName2'])
+        self.assertIsNotNone(objs[2].pk)
+        self.assertTrue(model.objects.all().count() == 4)
+        self.assertTrue(model.objects.removed().count() == 0)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            model.objects.bulk_create_or_restore([model(category='TestCategory', name='TestName3', tag='tag', value=0)])
+
+    def test_no_returning_rows(self):
+        SimpleUniqueRes.objects.create(name='TestName0').delete()
+        features = type(connection.features)
+        with mock.patch.object(features, 'can_return_rows_from_bulk_insert', False):
+            objs = [SimpleUniqueRes(name=f'TestName{i}') for i in range(3)]
+            SimpleUniqueRes.objects.bulk_create_or_restore(objs)
+        self.assertEqual(
+            [(obj.pk, obj.name) for obj in objs],
+            list(SimpleUniqueRes.objects.order_by('pk').values_list('pk', 'name')),
+        )
+
+    def test_duplicates(self):
+        SimpleUniqueRes.objects.create(name='TestName')
+        SimpleUniqueRes.objects.all().delete()
+
+        objs = SimpleRes.objects.bulk_create_or_restore([SimpleRes(name='TestName'), SimpleRes(name='TestName')])
+        self.assertNotEqual(objs[0].pk, objs[1].pk)
+
+        objs = SimpleUniqueRes.objects.bulk_create_or_restore([SimpleUniqueRes(name='TestName')])
+        self.assertTrue(SimpleUniqueRes.objects.filter(pk=objs[0].pk).exists())
+        self.assertTrue(SimpleUniqueRes.all_objects.count() == 1)
+
+
+class TestSoftRestoreBulk(TestCase):
+    def test_restore(self):
+        model = RestoreTogetherRes
+        objs = [model.objects.create(name=name) for name in ('TestName1', 'TestName1', 'TestName2', 'TestName3')]
+        model.objects.all().delete()
+        model.objects.bulk_create([model(name='TestName3')])
+        live = model.objects.get(name='TestName3')
+
+        # Removed rows, live keys, restore
+        with self.assertNumQueries(3):
+            count, skipped = model.objects.removed().restore()
+
+        self.assertTrue(count == 2)
+        self.assertEqual(sorted(skipped), [objs[0].pk, objs[3].pk])
+        self.assertEqual(set(model.objects.values_list('pk', flat=True)), {objs[1].pk, objs[2].pk, live.pk})
+
+    def test_live_indexes(self):
+        model = LiveIndexesRes
+        for name in ('TestName1', 'TestName1', 'TestName2'):
+            model.objects.bulk_create([model(category='TestCategory', name=name)])
+            model.objects.all().delete()
+        model.objects.bulk_create([model(category='TestCategory', name='TestName2')])
+
+        count, skipped = model.objects.removed().restore()
+        self.assertTrue(count == 1)
+        self.assertTrue(len(skipped) == 2)
+        self.assertTrue(model.objects.all().count() == 2)
+        self.assertEqual(model.objects.removed().restore(), (0, skipped))
+
+
+class TestSoftRestorePks(TestCase):
+    def test_pks(self):
+        model = RestoreTogetherRes
+        pks = [model.objects.create(name=name).pk for name in ('TestName1', 'TestName2')]
+        self.assertEqual(model.objects.soft_delete_pks(pks), (2, {'tests.RestoreTogetherRes': 2}))
+        model.objects.bulk_create([model(name='TestName1')])
+        pks.append(model.objects.get(name='TestName1').pk)
+        self.assertEqual(model.objects.soft_delete_pks(pks), (1, {'tests.RestoreTogetherRes': 1}))
+
+        # The newest row of the key goes first
+        self.assertEqual(model.objects.restore_pks(pks, batch_size=1), (2, [pks[0]]))
+        self.assertEqual(set(model.objects.values_list('pk', flat=True)), {pks[1], pks[2]})
+
+
+class TestSoftRestoreCache(TestCase):
+    def test_restore_cache(self):
+        model = ManyUniqueTogetherRes
+        removed = model.objects.create(category='TestCategory', name='TestName1', tag='tag1', value=0)
+        removed.delete()
+
+        with restore_cache(model):
+            # Savepoint, removed keys, insert, release
+            with self.assertNumQueries(4):
+                model.objects.create(category='TestCategory', name='TestName2', tag='tag2', value=0)
+            with self.assertNumQueries(3):
+                model.objects.create(category='TestCategory', name='TestName3', tag='tag3', value=0)
+            # Removed row by pk, restore
+            with self.assertNumQueries(4):
+                obj = model.objects.create(category='TestCategory', name='TestName11', tag='tag1', value=0)
+            self.assertEqual(obj.pk, removed.pk)
+
+            obj.delete()
+            model.objects.get(name='TestName3').delete()
+            with self.assertNumQueries(4):
+                obj = model.objects.create(category='TestCategory', name='TestName3', tag='tag', value=0)
+            self.assertTrue(model.objects.removed().get().pk == removed.pk)
+
+            model.objects.all().delete()
+            obj = model.objects.create(category='TestCategory', name='TestName2', tag='tag', value=0)
+            self.assertTrue(model.objects.all().count() == 1)
+            self.assertTrue(model.objects.removed().count() == 2)
+
+
+class TestSoftRestoreUpsert(TestCase):
+    def _unique_together(self, model):
+        obj = model.objects.create(category='TestCategory', name='TestName', value=0)
+        obj.delete()
+
+        obj2 = model.objects.create(category='TestCategory', name='TestName', value=1)
+        self.assertEqual(obj2.pk, obj.pk)
+        self.assertTrue(model.objects.all().count() == 1)
+        self.assertTrue(model.objects.removed().count() == 0)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            model.objects.create(category='TestCategory', name='TestName', value=2)
+
+        obj3 = model.objects.create(category='TestCategory', name='TestName3', value=3)
+        self.assertNotEqual(obj3.pk, obj.pk)
+        self.assertEqual(model.objects.get(pk=obj3.pk).value, 3)
+
+    def test_upsert(self):
+        self._unique_together(UpsertRes)
+        self._unique_together(UniqueTogetherRes)
+
+    def test_partial_unique(self):
+        # The partial unique index can't be a conflict target, the row is restored by the lookup
+        obj = PartialUpsertRes.objects.create(name='TestName')
+        obj.delete()
+        self.assertTrue(PartialUpsertRes.objects.create(name='TestName').pk == obj.pk)
+        self.assertTrue(PartialUpsertRes.objects.removed().count() == 0)
+
+    @skipUnlessDBFeature('can_return_columns_from_insert')
+    def test_num_queries(self):
+        UpsertRes.objects.create(category='TestCategory', name='TestName', value=0).delete()
+
+        with self.assertNumQueries(1):
+            UpsertRes.objects.create(category='TestCategory', name='TestName', value=1)
+        with self.assertNumQueries(1):
+            UpsertRes.objects.create(category='TestCategory', name='TestName2', value=1)
+
+
+class TestSoftRestoreRetries(TestCase):
+    def test_retry(self):
+        removed = RestoreLockRes.objects.create(name='TestName')
+        removed.delete()
+        save_or_restore = RestoreLockRes._soft_remover_save_or_restore
+        attempts = []
+
+        def flaky(obj, *args, **kwargs):
+            attempts.append(obj.pk)
+            if len(attempts) == 1:
+                # A concurrent save restored the row first
+                obj.pk = removed.pk
+                raise IntegrityError()
+            return save_or_restore(obj, *args, **kwargs)
+
+        with mock.patch.object(RestoreLockRes, '_soft_remover_save_or_restore', flaky):
+            obj = RestoreLockRes.objects.create(name='TestName')
+        self.assertEqual(attempts, [None, None])
+        self.assertTrue(obj.pk == removed.pk)
+        self.assertTrue(RestoreLockRes.objects.removed().count() == 0)
+
+    def test_retries_exhausted(self):
+        error = mock.Mock(side_effect=OperationalError())
+        with mock.patch.object(RestoreLockRes, '_soft_remover_save_or_restore', error):
+            with self.assertRaises(OperationalError):
+                RestoreLockRes.objects.create(name='TestName')
+        self.assertTrue(error.call_count == RestoreLockRes._meta.soft_remover.restore_retries == 3)
+
+
+@skipUnlessDBFeature('has_select_for_update_skip_locked')
+class TestSoftRestoreConcurrent(TransactionTestCase):
+    def test_skip_locked(self):
+        removed = RestoreLockRes.objects.create(name='TestName')
+        removed.delete()
+        locked, done = threading.Event(), threading.Event()
+
+        def holder():
+            try:
+                with transaction.atomic():
+                    list(RestoreLockRes.objects.removed().select_for_update())
+                    locked.set()
+                    done.wait(10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=holder)
+        thread.start()
+        try:
+            self.assertTrue(locked.wait(10))
+            # The locked row is skipped, the object is inserted
+            obj = RestoreLockRes.objects.create(name='TestName')
+        finally:
+            done.set()
+            thread.join()
+        self.assertNotEqual(obj.pk, removed.pk)
+        self.assertTrue(RestoreLockRes.objects.removed().filter(pk=removed.pk).exists())
+
+    def test_create_same_key(self):
+        removed = []
+        for _ in range(4):
+            obj = RestoreLockRes.objects.create(name='TestName')
+            RestoreLockRes.objects.filter(pk=obj.pk).delete()
+            removed.append(obj.pk)
+        pks, errors = [], []
+
+        def worker():
+            try:
+                pks.append(RestoreLockRes.objects.create(name='TestName').pk)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Every removed row is restored once, the rest are inserted
+        self.assertEqual(errors, [])
+        self.assertTrue(len(pks) == len(set(pks)) == 16)
+        self.assertTrue(RestoreLockRes.objects.all().count() == 16)
+        self.assertTrue(RestoreLockRes.objects.removed().count() == 0)
+        self.assertTrue(set(removed) <= set(pks))
@@ -0,0 +1,81 @@
+from unittest import mock
+
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from soft_remover import restore_cache
+
+from .models import RemovedAtRem, RemovedAtRes, SimpleUniqueRes
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return 'replica'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+
+@override_settings(DATABASE_ROUTERS=[ReplicaRouter()])
+class TestSoftRemoverRouter(TestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        RemovedAtRes.objects.removed_ids().invalidate()
+
+    def assertNoReplicaQueries(self):
+        return self.assertNumQueries(0, using='replica')
+
+    def test_delete(self):
+        with self.assertNoReplicaQueries():
+            for _ in range(2):
+                obj = RemovedAtRem.objects.create(name='TestName')
+                obj.delete()
+        self.assertTrue(obj.remver == 2)
+
+    def test_save(self):
+        with self.assertNoReplicaQueries():
+            obj = SimpleUniqueRes.objects.create(name='TestName')
+            obj.delete()
+            restored = SimpleUniqueRes(name='TestName')
+            restored.save()
+        self.assertTrue(restored.pk == obj.pk)
+        self.assertFalse(SimpleUniqueRes.all_objects.using('default').get(pk=obj.pk).is_removed)
+
+    def test_save_restore_cache(self):
+        obj = SimpleUniqueRes.objects.create(name='TestName')
+        obj.delete()
+        with self.assertNoReplicaQueries(), restore_cache(SimpleUniqueRes):
+            restored = SimpleUniqueRes(name='TestName')
+            restored.save()
+        self.assertTrue(restored.pk == obj.pk)
+
+    def test_bulk(self):
+        with self.assertNoReplicaQueries():
+            objs = [SimpleUniqueRes(name=f'TestName{i}') for i in range(3)]
+            SimpleUniqueRes.objects.bulk_create_or_restore(objs)
+            pks = [obj.pk for obj in objs]
+            SimpleUniqueRes.objects.filter(pk=pks[0]).delete()
+            SimpleUniqueRes.objects.removed().restore()
+            SimpleUniqueRes.objects.soft_delete_pks(pks)
+            SimpleUniqueRes.objects.restore_pks(pks[:2])
+            SimpleUniqueRes.objects.bulk_create_or_restore([SimpleUniqueRes(name='TestName2')])
+            SimpleUniqueRes.objects.all().delete()
+            count = SimpleUniqueRes.objects.removed().purge()
+        self.assertTrue(count == 3)
+
+    def test_replica_reads(self):
+        obj = RemovedAtRes.objects.create(name='TestName')
+        obj.delete()
+        with self.assertNoReplicaQueries():
+            self.assertTrue(RemovedAtRes.objects.is_removed_many([obj.pk]) == {obj.pk: True})
+            self.assertTrue([change.pk for change in RemovedAtRes.objects.removed_changes()] == [obj.pk])
+
+        RemovedAtRes.objects.removed_ids().invalidate()
+        with mock.patch.object(RemovedAtRes._meta.soft_remover, 'replica_reads', True):
+            with CaptureQueriesContext(connections['replica']) as queries:
+                # The replica is empty
+                self.assertTrue(RemovedAtRes.objects.is_removed_many([obj.pk]) == {obj.pk: False})
+                self.assertTrue(list(RemovedAtRes.objects.removed_changes()) == [])
+        self.assertTrue(len(queries) == 2)
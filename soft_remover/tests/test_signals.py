@@ -0,0 +1,120 @@
+from collections import Counter
+
+from django.test import TestCase, override_settings, skipUnlessDBFeature
+
+from soft_remover.metrics import SoftRemoverMetrics
+from soft_remover.signals import pre_soft_delete, post_soft_delete, post_restore
+
+from .models import UniqueTogetherRem, UniqueTogetherRes, UpsertRes, CascadeRes, CascadeChildRem
+
+
+class CounterMetrics(SoftRemoverMetrics):
+    counters = Counter()
+    timings = Counter()
+
+    def increment(self, model, name, value=1):
+        self.counters[(model._meta.label, name)] += value
+
+    def timing(self, model, name, seconds):
+        self.timings[(model._meta.label, name)] += 1
+
+
+class TestSoftRemoverSignals(TestCase):
+    def setUp(self):
+        self.received = []
+
+        def receiver(signal, sender, **kwargs):
+            self.received.append((signal, sender, kwargs.get('instance'), kwargs.get('count')))
+
+        for signal in (pre_soft_delete, post_soft_delete, post_restore):
+            signal.connect(receiver)
+            self.addCleanup(signal.disconnect, receiver)
+
+    def test_signals(self):
+        obj = UniqueTogetherRem.objects.create(category='TestCategory', name='TestName', value=0)
+        obj.delete()
+        UniqueTogetherRem.objects.create(category='TestCategory', name='TestName2', value=0)
+        UniqueTogetherRem.objects.all().delete()
+        UniqueTogetherRem.objects.removed().restore()
+
+        self.assertEqual(self.received, [
+            (pre_soft_delete, UniqueTogetherRem, obj, None),
+            (post_soft_delete, UniqueTogetherRem, obj, 1),
+            (pre_soft_delete, UniqueTogetherRem, None, None),
+            (post_soft_delete, UniqueTogetherRem, None, 1),
+            (post_restore, UniqueTogetherRem, None, 2),
+        ])
+
+    def test_cascade(self):
+        parent = CascadeRes.objects.create(name='TestName')
+        CascadeChildRem.objects.create(parent=parent, name='TestName')
+        parent.delete()
+        parent.restore()
+
+        self.assertEqual(self.received[1:], [
+            (post_soft_delete, CascadeRes, parent, 1),
+            (post_restore, CascadeRes, parent, 1),
+        ])
+
+
+    @skipUnlessDBFeature('can_return_columns_from_insert')
+    def test_upsert(self):
+        obj = UpsertRes.objects.create(category='TestCategory', name='TestName', value=0)
+        obj.delete()
+        restored = UpsertRes.objects.create(category='TestCategory', name='TestName', value=1)
+        UpsertRes.objects.create(category='TestCategory', name='TestName2', value=1)
+
+        self.assertTrue(restored.pk == obj.pk)
+        self.assertEqual(self.received[2:], [(post_restore, UpsertRes, restored, 1)])
+
+
+@override_settings(SOFT_REMOVER_METRICS='soft_remover.tests.test_signals.CounterMetrics')
+class TestSoftRemoverMetrics(TestCase):
+    def setUp(self):
+        CounterMetrics.counters.clear()
+        CounterMetrics.timings.clear()
+
+    def test_metrics(self):
+        UniqueTogetherRem.objects.create(category='TestCategory', name='TestName', value=0).delete()
+        UniqueTogetherRem.objects.create(category='TestCategory', name='TestName', value=0)
+        UniqueTogetherRem.objects.all().delete()
+        UniqueTogetherRem.objects.removed().purge()
+
+        obj = UniqueTogetherRes.objects.create(category='TestCategory', name='TestName', value=0)
+        obj.delete()
+        UniqueTogetherRes.objects.create(category='TestCategory', name='TestName', value=0)
+
+        parent = CascadeRes.objects.create(name='TestName')
+        CascadeChildRem.objects.create(parent=parent, name='TestName')
+        CascadeRes.objects.all().delete()
+        CascadeRes.objects.removed().restore()
+
+        self.assertEqual(CounterMetrics.counters, Counter({
+            ('tests.UniqueTogetherRem', 'removed'): 2,
+            ('tests.UniqueTogetherRem', 'purged'): 2,
+            ('tests.UniqueTogetherRes', 'removed'): 1,
+            ('tests.UniqueTogetherRes', 'restored'): 1,
+            ('tests.UniqueTogetherRes', 'restore_miss'): 1,
+            ('tests.UniqueTogetherRes', 'restore_hit'): 1,
+            ('tests.CascadeRes', 'removed'): 1,
+            ('tests.CascadeRes', 'restored'): 1,
+            ('tests.CascadeRes', 'restore_miss'): 1,
+            ('tests.CascadeChildRem', 'removed'): 1,
+            ('tests.CascadeChildRem', 'restored'): 1,
+        }))
+        # The bulk removal numbers the versions in SQL
+        self.assertEqual(CounterMetrics.timings[('tests.UniqueTogetherRem', 'remver_lookup')], 1)
+
+    @skipUnlessDBFeature('can_return_columns_from_insert')
+    def test_upsert_metrics(self):
+        UpsertRes.objects.create(category='TestCategory', name='TestName', value=0).delete()
+        UpsertRes.objects.create(category='TestCategory', name='TestName', value=0)
+        UpsertRes.objects.create(category='TestCategory', name='TestName2', value=0)
+
+        self.assertEqual(CounterMetrics.counters, Counter({
+            ('tests.UpsertRes', 'upserted'): 3,
+            ('tests.UpsertRes', 'removed'): 1,
+            ('tests.UpsertRes', 'restored'): 1,
+            ('tests.UpsertRes', 'restore_hit'): 1,
+            ('tests.UpsertRes', 'restore_miss'): 2,
+        }))